@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'user',
     'rest_framework',
@@ -42,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.querycheck.QueryCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,13 +77,30 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
+# DB_POOL_SIZE > 0 serves connections from a per-process pool that
+# outlives requests, otherwise DB_CONN_MAX_AGE controls how long Django
+# keeps a connection open (0 closes it after every request)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.backends.postgresql_pool' if DB_POOL_SIZE
+        else 'django.db.backends.postgresql',
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE
+        else int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'POOL': {
+            'SIZE': DB_POOL_SIZE,
+            'MAX_LIFETIME': int(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+            'IDLE_TIMEOUT': int(os.environ.get('DB_POOL_IDLE_TIMEOUT', 300)),
+            'CHECK_INTERVAL': int(
+                os.environ.get('DB_POOL_CHECK_INTERVAL', 30)
+            ),
+            'TIMEOUT': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        },
         'TEST':{
             'NAME': 'my_test_db'
         }
@@ -90,6 +110,44 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
+# Hasher of new passwords: pbkdf2, argon2 (needs argon2-cffi) or bcrypt
+# (needs bcrypt). The others stay listed so existing hashes still verify;
+# they are upgraded on the user's next login, as are hashes made with
+# costs other than the ones below
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'user.hashers.PBKDF2PasswordHasher',
+    'argon2': 'user.hashers.Argon2PasswordHasher',
+    'bcrypt': 'user.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS.pop(PASSWORD_HASHER),
+                    *_PASSWORD_HASHERS.values(),
+                    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 180000)
+)
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST',
+                                               2))
+# KiB
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 19456)
+)
+PASSWORD_ARGON2_PARALLELISM = int(
+    os.environ.get('PASSWORD_ARGON2_PARALLELISM', 1)
+)
+PASSWORD_BCRYPT_ROUNDS = int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12))
+
+# Passwords are checked on WORKERS threads per process, at most
+# MAX_PENDING checks running or queued. Beyond that a login waits up to
+# TIMEOUT seconds for a slot, then gets a 503. See user.backends
+PASSWORD_VERIFY_POOL = {
+    'WORKERS': int(os.environ.get('PASSWORD_VERIFY_WORKERS', 2)),
+    'MAX_PENDING': int(os.environ.get('PASSWORD_VERIFY_MAX_PENDING', 16)),
+    'TIMEOUT': float(os.environ.get('PASSWORD_VERIFY_TIMEOUT', 5)),
+}
+
+AUTHENTICATION_BACKENDS = ['user.backends.PooledModelBackend']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -123,4 +181,115 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Uploaded recipe images. Not served under a URL: the API checks access
+# and hands the file to the front server, see RECIPE_IMAGES. Put
+# FILE_UPLOAD_TEMP_DIR on the same filesystem so storing an upload is a
+# rename
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+FILE_UPLOAD_TEMP_DIR = os.environ.get('FILE_UPLOAD_TEMP_DIR') or None
+
 AUTH_USER_MODEL = "core.User"
+
+REST_FRAMEWORK = {
+    'PAGE_SIZE': int(os.environ.get('PAGE_SIZE', 50)),
+    # orjson backed JSON, using the stdlib when orjson is not installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token buckets of user.throttling, '<burst>/<refill period>', by
+    # client address and by posted email. Behind a proxy set NUM_PROXIES
+    'DEFAULT_THROTTLE_RATES': {
+        'token_ip': os.environ.get('THROTTLE_TOKEN_IP', '30/min'),
+        'token_email': os.environ.get('THROTTLE_TOKEN_EMAIL', '10/min'),
+        'signup_ip': os.environ.get('THROTTLE_SIGNUP_IP', '10/hour'),
+        'signup_email': os.environ.get('THROTTLE_SIGNUP_EMAIL', '3/hour'),
+    },
+    'NUM_PROXIES': int(os.environ['NUM_PROXIES'])
+    if os.environ.get('NUM_PROXIES') else None,
+}
+
+# Cache holding the throttle buckets. The default local memory cache is
+# per process, point this at a shared alias when running several
+THROTTLE_CACHE_ALIAS = os.environ.get('THROTTLE_CACHE_ALIAS', 'default')
+
+# Upper bound for the ?page_size= override on paginated list endpoints
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
+
+# Largest list accepted by POST /api/recipe/recipe/bulk/
+BULK_MAX_RECIPES = int(os.environ.get('BULK_MAX_RECIPES', 1000))
+
+# Recipes read per server-side cursor fetch by exports
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+
+# Text search configuration of Recipe.search_vector and ?search= queries.
+# Changing it needs the vectors rebuilt, see migration 0009
+SEARCH_CONFIG = os.environ.get('SEARCH_CONFIG', 'english')
+
+# List actions build their response from values() rows, see recipe.values
+FAST_LIST_SERIALIZATION = os.environ.get('FAST_LIST_SERIALIZATION',
+                                         '1') == '1'
+
+# Token -> user lookups cached by user.authentication. Set
+# TOKEN_CACHE_ALIAS to a shared CACHES alias to back the in-process LRU
+TOKEN_CACHE = {
+    'TTL': int(os.environ.get('TOKEN_CACHE_TTL', 60)),
+    'MAX_SIZE': int(os.environ.get('TOKEN_CACHE_MAX_SIZE', 10000)),
+    'CACHE_ALIAS': os.environ.get('TOKEN_CACHE_ALIAS') or None,
+}
+
+# Serialized recipe, tag and ingredient responses, see recipe.caching.
+# RESPONSE_CACHE_BACKEND is 'local' (per process LRU) or 'redis', which
+# needs redis-py and RESPONSE_CACHE_URL, e.g. redis://redis:6379/0
+RESPONSE_CACHE = {
+    'ENABLED': os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1',
+    'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'local'),
+    'URL': os.environ.get('RESPONSE_CACHE_URL'),
+    'KEY_PREFIX': os.environ.get('RESPONSE_CACHE_KEY_PREFIX', 'recipe-api:'),
+    'TTL': int(os.environ.get('RESPONSE_CACHE_TTL', 300)),
+    'MAX_SIZE': int(os.environ.get('RESPONSE_CACHE_MAX_SIZE', 10000)),
+}
+
+# Pagination classes are set per viewset, PAGE_SIZE is only their default
+SILENCED_SYSTEM_CHECKS = ['rest_framework.W001']
+
+# Recipe image uploads (JPEG, PNG or WebP), see core.images. VARIANTS
+# are WebP copies fitting in a square of the given size, generated on
+# WORKERS threads per process after the upload is committed (0 generates
+# them inline).
+# SENDFILE_HEADER 'X-Accel-Redirect' (nginx, an internal location serving
+# MEDIA_ROOT at SENDFILE_PREFIX) or 'X-Sendfile' (Apache, lighttpd) lets
+# the front server send the bytes; unset, Django streams them
+RECIPE_IMAGES = {
+    'WORKERS': int(os.environ.get('RECIPE_IMAGE_WORKERS', 2)),
+    'MAX_UPLOAD_SIZE': int(os.environ.get('RECIPE_IMAGE_MAX_UPLOAD_SIZE',
+                                          10 * 1024 * 1024)),
+    'MAX_PIXELS': int(os.environ.get('RECIPE_IMAGE_MAX_PIXELS', 40000000)),
+    'VARIANTS': {'thumb': 200, 'medium': 800},
+    'QUALITY': int(os.environ.get('RECIPE_IMAGE_QUALITY', 80)),
+    'SENDFILE_HEADER': os.environ.get('RECIPE_IMAGE_SENDFILE_HEADER', ''),
+    'SENDFILE_PREFIX': os.environ.get('RECIPE_IMAGE_SENDFILE_PREFIX',
+                                      '/protected-media/'),
+}
+
+# Threads running views per process when served through app.asgi. Each
+# holds a database connection while busy, keep it within DB_POOL_SIZE
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 8))
+
+# Per-request query count and timings as Server-Timing headers, and per
+# view histograms at /metrics. Keep /metrics off the public network
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0') == '1'
+
+# Report requests running the same query more than THRESHOLD times, an
+# N+1 in the making. RAISE turns the report into a 500 for test and
+# staging runs, see core.querycheck
+QUERY_CHECK = {
+    'ENABLED': os.environ.get('QUERY_CHECK', '0') == '1',
+    'THRESHOLD': int(os.environ.get('QUERY_CHECK_THRESHOLD', 5)),
+    'RAISE': os.environ.get('QUERY_CHECK_RAISE', '0') == '1',
+}
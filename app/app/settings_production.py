@@ -0,0 +1,32 @@
+"""
+Production settings for app project, the defaults of gunicorn.conf.py.
+
+Everything of app.settings applies, with debugging off and the secrets
+and hosts required from the environment:
+
+    DJANGO_SECRET_KEY       secret key
+    DJANGO_ALLOWED_HOSTS    comma separated host names
+    DJANGO_SECURE_PROXY     1 when a proxy terminates TLS and sets
+                            X-Forwarded-Proto
+    DJANGO_HSTS_SECONDS     Strict-Transport-Security max-age, 0 for none
+"""
+
+import os
+
+from app.settings import *  # noqa
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [host.strip() for host in
+                 os.environ['DJANGO_ALLOWED_HOSTS'].split(',')
+                 if host.strip()]
+
+if os.environ.get('DJANGO_SECURE_PROXY', '0') == '1':
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+    SESSION_COOKIE_SECURE = True
+    CSRF_COOKIE_SECURE = True
+
+SECURE_HSTS_SECONDS = int(os.environ.get('DJANGO_HSTS_SECONDS', 0))
+SECURE_REFERRER_POLICY = 'same-origin'
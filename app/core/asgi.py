@@ -0,0 +1,52 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections
+
+
+class ThreadPoolASGIHandler(ASGIHandler):
+    """ ASGIHandler running the (synchronous) middleware and views on a
+    pool of ASGI_THREADS threads. Django's handler runs them through
+    sync_to_async, which asgiref 3.3+ makes thread sensitive: every
+    request then waits for one shared thread. Here the event loop keeps
+    reading bodies and writing responses of any number of connections
+    while at most ASGI_THREADS requests run Python code and hold a
+    database connection.
+
+    Connections are handled like under WSGI, on the thread using them:
+    obsolete ones are closed before the request and after it, as Django's
+    request_started and request_finished receivers run on other threads
+    here """
+
+    def __init__(self, threads=None):
+        super().__init__()
+        self.executor = ThreadPoolExecutor(
+            threads or getattr(settings, 'ASGI_THREADS', 8),
+            thread_name_prefix='asgi',
+        )
+
+    async def get_response(self, request):
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            functools.partial(context.run, self.get_response_sync, request),
+        )
+
+    def get_response_sync(self, request):
+        close_old_connections()
+        try:
+            return super().get_response(request)
+        finally:
+            close_old_connections()
+
+
+def get_asgi_application():
+    """ Like django.core.asgi.get_asgi_application, serving requests on
+    a thread pool """
+    django.setup(set_prefix=False)
+    return ThreadPoolASGIHandler()
@@ -0,0 +1,65 @@
+import math
+import time
+
+
+def percentile(values, pct):
+    """ Nearest-rank percentile of a non empty list of numbers """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(timings):
+    """ Summary statistics, in milliseconds, of timings in seconds """
+    ms = [t * 1000 for t in timings]
+    return {
+        'runs': len(ms),
+        'min': round(min(ms), 3),
+        'mean': round(sum(ms) / len(ms), 3),
+        'p50': round(percentile(ms, 50), 3),
+        'p95': round(percentile(ms, 95), 3),
+        'p99': round(percentile(ms, 99), 3),
+        'max': round(max(ms), 3),
+    }
+
+
+def measure(func, repeat=20, warmup=2, clock=time.perf_counter):
+    """ Call func warmup times untimed, then repeat times and summarize """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = clock()
+        func()
+        timings.append(clock() - start)
+    return summarize(timings)
+
+
+def throughput(count, elapsed):
+    """ Operations per second, None when nothing was timed """
+    return round(count / elapsed, 1) if elapsed else None
+
+
+def compare(baseline, current, threshold=10.0):
+    """ Percent change of each scenario's latency percentiles and
+    throughput between two benchmark_api results. A scenario regressed
+    when its p50 or p95 grew by more than threshold percent; p99 is
+    reported but too noisy to gate on """
+    rows = []
+    for name, stats in current['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        row = {'scenario': name}
+        for key in ('p50', 'p95', 'p99', 'rps'):
+            if base.get(key) and stats.get(key) is not None:
+                row[key] = round((stats[key] - base[key]) / base[key] * 100,
+                                 1)
+            else:
+                row[key] = None
+        row['regressed'] = any(
+            row[key] is not None and row[key] > threshold
+            for key in ('p50', 'p95')
+        )
+        rows.append(row)
+    return rows
@@ -0,0 +1,149 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ImproperlyConfigured
+
+MISSING = object()
+
+
+class LRUCache:
+    """ Thread safe in-process LRU cache whose entries expire ttl seconds
+    after they were set """
+
+    def __init__(self, max_size=1024, ttl=300, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, MISSING)
+            if item is MISSING:
+                return default
+            expires, value = item
+            if expires <= self.clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = self.clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """ LRUCache compatible wrapper around a Redis client (or anything
+    speaking the same get/set/delete commands). Values are pickled and
+    expiry is left to Redis """
+
+    def __init__(self, client, ttl=300, prefix=''):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key, default=None):
+        data = self.client.get(self.prefix + key)
+        return default if data is None else pickle.loads(data)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value),
+                        ex=self.ttl if ttl is None else ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+def build_cache(options):
+    """ Cache from a settings dict: BACKEND 'local' (default) or 'redis'
+    with URL, plus TTL, MAX_SIZE and KEY_PREFIX """
+    ttl = options.get('TTL', 300)
+    if options.get('BACKEND', 'local') == 'local':
+        return LRUCache(max_size=options.get('MAX_SIZE', 1024), ttl=ttl)
+    try:
+        import redis
+    except ImportError:
+        raise ImproperlyConfigured('The redis cache backend needs redis-py')
+    return RedisCache(redis.Redis.from_url(options['URL']), ttl=ttl,
+                      prefix=options.get('KEY_PREFIX', ''))
+
+
+class SingleFlight:
+    """ Collapse concurrent calls for the same key into one: the first
+    caller runs the function, callers arriving meanwhile wait for and
+    share its result (or exception) """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LazyExecutor:
+    """ ThreadPoolExecutor created on first use. A server master that
+    imports the app before forking then never starts threads its workers
+    would inherit dead """
+
+    def __init__(self, thread_name_prefix=''):
+        self.thread_name_prefix = thread_name_prefix
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self, workers):
+        """ The executor, started with workers threads if not yet """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        workers, thread_name_prefix=self.thread_name_prefix
+                    )
+        return self._executor
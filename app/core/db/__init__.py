@@ -0,0 +1,12 @@
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+@contextmanager
+def execute_wrapper(wrapper):
+    """ connection.execute_wrapper(wrapper) on every configured database """
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
@@ -0,0 +1,95 @@
+import threading
+
+from django.db.backends.postgresql import base, creation
+from psycopg2 import extensions
+
+from core.db.pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def check_connection(connection):
+    """ Ping an idle connection before handing it out again """
+    if connection.closed:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return True
+
+
+def reset_connection(connection):
+    """ Roll back anything a request left open, drop broken connections """
+    if connection.closed:
+        return False
+    status = connection.get_transaction_status()
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    return True
+
+
+def get_pool(alias, conn_params, options):
+    """ One pool per alias and set of connection parameters, shared by the
+    per-thread DatabaseWrappers of that alias """
+    key = (alias, tuple(sorted((k, str(v)) for k, v in conn_params.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                lambda: base.Database.connect(**conn_params),
+                max_size=options.get('SIZE', 10),
+                max_lifetime=options.get('MAX_LIFETIME', 1800),
+                idle_timeout=options.get('IDLE_TIMEOUT', 300),
+                check_interval=options.get('CHECK_INTERVAL', 30),
+                timeout=options.get('TIMEOUT', 10),
+                check=check_connection,
+                reset=reset_connection,
+            )
+        return _pools[key]
+
+
+def close_pools():
+    """ Close all idle pooled connections, e.g. before dropping a DB """
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the test database in use
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """ PostgreSQL backend that borrows connections from a process wide
+    ConnectionPool, configured by the POOL dict of the database settings,
+    and hands them back when Django closes the connection """
+
+    creation_class = DatabaseCreation
+    pool = None
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(
+            self.alias, conn_params, self.settings_dict.get('POOL', {})
+        )
+        connection = self.pool.acquire()
+
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
@@ -0,0 +1,139 @@
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """ Raised when no connection became free within the pool timeout """
+
+
+class PooledConnection:
+    """ Book keeping for one connection owned by a ConnectionPool """
+
+    def __init__(self, connection, created):
+        self.connection = connection
+        self.created = created
+        self.released = created
+
+
+class ConnectionPool:
+    """ Bounded, thread safe pool of DB-API connections.
+
+    connect() opens a new connection. check(conn) is a health check run on
+    connections that sat idle for longer than check_interval seconds,
+    reset(conn) prepares a returned connection for reuse and close(conn)
+    closes one. The checks return False for a connection that must be
+    thrown away. Connections older than max_lifetime or idle for longer
+    than idle_timeout seconds are closed instead of being handed out """
+
+    def __init__(self, connect, max_size=10, max_lifetime=1800,
+                 idle_timeout=300, check_interval=30, timeout=10,
+                 check=None, reset=None, close=None, clock=time.monotonic):
+        self.connect = connect
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.timeout = timeout
+        self.check = check or (lambda conn: True)
+        self.reset = reset or (lambda conn: True)
+        self.close_connection = close or (lambda conn: conn.close())
+        self.clock = clock
+        self._idle = []
+        self._in_use = {}
+        self._size = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        deadline = self.clock() + self.timeout
+        while True:
+            with self._cond:
+                pooled = self._checkout(deadline)
+            if pooled is None:
+                return self._open()
+            if self._usable(pooled):
+                with self._cond:
+                    self._in_use[id(pooled.connection)] = pooled
+                return pooled.connection
+            self._discard(pooled)
+
+    def release(self, connection):
+        with self._cond:
+            pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            self.close_connection(connection)
+            return
+        if self._expired(pooled) or not self._safe(self.reset, connection):
+            self._discard(pooled)
+            return
+        pooled.released = self.clock()
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    def close(self):
+        """ Close every idle connection, in use ones close on release """
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self):
+        with self._cond:
+            return {'size': self._size, 'idle': len(self._idle),
+                    'in_use': len(self._in_use)}
+
+    def _checkout(self, deadline):
+        """ Pop the most recently used idle connection, or reserve a slot
+        for a new one by returning None. Called with the lock held """
+        while True:
+            if self._idle:
+                return self._idle.pop()
+            if self._size < self.max_size:
+                self._size += 1
+                return None
+            remaining = deadline - self.clock()
+            if remaining <= 0 or not self._cond.wait(remaining):
+                raise PoolTimeout(
+                    f'No connection free after {self.timeout}s '
+                    f'(pool size {self.max_size})'
+                )
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        pooled = PooledConnection(connection, self.clock())
+        with self._cond:
+            self._in_use[id(connection)] = pooled
+        return connection
+
+    def _usable(self, pooled):
+        if self._expired(pooled):
+            return False
+        if self.clock() - pooled.released > self.idle_timeout:
+            return False
+        if self.clock() - pooled.released >= self.check_interval:
+            return self._safe(self.check, pooled.connection)
+        return True
+
+    def _expired(self, pooled):
+        return self.clock() - pooled.created > self.max_lifetime
+
+    def _safe(self, func, connection):
+        try:
+            return func(connection)
+        except Exception:
+            return False
+
+    def _discard(self, pooled):
+        try:
+            self.close_connection(pooled.connection)
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
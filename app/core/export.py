@@ -0,0 +1,50 @@
+from itertools import islice
+
+from core.models import Recipe
+
+EXPORT_FIELDS = ('id', 'title', 'price', 'time_minutes', 'link', 'tags',
+                 'ingredients')
+RELATIONS = ('tags', 'ingredients')
+
+
+def chunks(iterable, size):
+    """ Split an iterable into lists of at most size items """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def related_names(recipe_ids):
+    """ {relation: {recipe id: [names]}} for a chunk of recipes, one query
+    per relation """
+    names = {}
+    for field in RELATIONS:
+        m2m = Recipe._meta.get_field(field)
+        name = f'{m2m.m2m_reverse_field_name()}__name'
+        links = m2m.remote_field.through.objects\
+            .filter(recipe_id__in=recipe_ids)\
+            .order_by('recipe_id', name)\
+            .values_list('recipe_id', name)
+        names[field] = {}
+        for recipe_id, value in links:
+            names[field].setdefault(recipe_id, []).append(value)
+    return names
+
+
+def export_recipes(queryset, chunk_size=2000):
+    """ Yield a dict per recipe of queryset, in id order, with tag and
+    ingredient names. Rows are read through a server-side cursor and the
+    names joined per chunk, so memory use does not depend on the number
+    of recipes """
+    columns = [f for f in EXPORT_FIELDS if f not in RELATIONS]
+    rows = queryset.order_by('id').values(*columns)\
+        .iterator(chunk_size=chunk_size)
+    for chunk in chunks(rows, chunk_size):
+        names = related_names([row['id'] for row in chunk])
+        for row in chunk:
+            for field in RELATIONS:
+                row[field] = names[field].get(row['id'], [])
+            yield row
@@ -0,0 +1,60 @@
+import logging
+import uuid
+
+from django.core.cache import caches
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class HealthCheckError(Exception):
+    """ A dependency the app needs is not ready """
+
+
+def check_database(alias='default'):
+    """ Actually open a connection and run a query on it """
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def check_cache(alias='default'):
+    """ Round trip a throwaway value through the cache backend """
+    cache = caches[alias]
+    key = f'health-check:{uuid.uuid4().hex}'
+    cache.set(key, 1, 10)
+    if cache.get(key) != 1:
+        raise HealthCheckError(f'Cache "{alias}" did not return a value')
+    cache.delete(key)
+
+
+_migrated = set()
+
+
+def check_migrations(alias='default'):
+    """ Fail while migrations are unapplied. Once a process saw them all
+    applied it never rebuilds the migration graph again """
+    if alias in _migrated:
+        return
+    executor = MigrationExecutor(connections[alias])
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        raise HealthCheckError(f'{len(plan)} unapplied migrations')
+    _migrated.add(alias)
+
+
+def run_checks(checks):
+    """ Run each named check, returning (all_ok, {name: status}). Errors
+    are logged, the status only says 'unavailable' so readyz shows no
+    internals to unauthenticated callers """
+    results = {}
+    for name, check in checks:
+        try:
+            check()
+            results[name] = 'ok'
+        except Exception:
+            logger.exception('Health check %s failed', name)
+            results[name] = 'unavailable'
+    ok = all(status == 'ok' for status in results.values())
+    return ok, results
@@ -0,0 +1,174 @@
+import logging
+import os
+import posixpath
+import shutil
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import connections, transaction
+from django.http import FileResponse, HttpResponse
+
+from core.cache import LazyExecutor
+from core.models import CollectionVersion, Recipe
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+# Pillow format: (extension, content type) of the formats stored
+FORMATS = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'PNG': ('png', 'image/png'),
+    'WEBP': ('webp', 'image/webp'),
+}
+VARIANT_FORMAT = 'WEBP'
+
+
+def upload_to_disk(request):
+    """ Spool every file of request to a temporary file instead of
+    keeping small ones in memory. Call before the body is parsed """
+    request.upload_handlers = [TemporaryFileUploadHandler(request)]
+
+
+def inspect(file):
+    """ (format, (width, height)) of an uploaded image, ValueError if it
+    is not one Pillow can read """
+    if Image is None:
+        raise ImproperlyConfigured('Recipe images need Pillow installed')
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            image.verify()
+            return image.format, image.size
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ValueError(str(exc))
+    finally:
+        file.seek(0)
+
+
+def upload_id(name):
+    """ Directory of the upload stored as name, new for every upload """
+    return posixpath.basename(posixpath.dirname(name))
+
+
+def variant_name(name, variant):
+    """ Storage name of a variant of the image stored as name """
+    if variant == 'original':
+        return name
+    return posixpath.join(posixpath.dirname(name),
+                          f'{variant}.{FORMATS[VARIANT_FORMAT][0]}')
+
+
+def write_variants(name):
+    """ Write the RECIPE_IMAGES variants next to the image stored as
+    name, returning their names. Each is resized from the next larger
+    one, and JPEGs are decoded at the smallest scale still covering the
+    largest, a fraction of a full decode for photos """
+    config = settings.RECIPE_IMAGES
+    variants = sorted(config['VARIANTS'].items(), key=lambda v: -v[1])
+    if not variants:
+        return []
+    largest = variants[0][1]
+    with Image.open(default_storage.path(name)) as image:
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert(
+            'RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB'
+        )
+    for variant, size in variants:
+        image.thumbnail((size, size), Image.LANCZOS)
+        path = default_storage.path(variant_name(name, variant))
+        image.save(f'{path}.tmp', VARIANT_FORMAT,
+                   quality=config['QUALITY'])
+        os.replace(f'{path}.tmp', path)
+    return [variant for variant, _ in variants]
+
+
+def generate_variants(recipe_id, user_id, name):
+    """ Write the variants of a recipe's image and record them, unless
+    the recipe was deleted or got another image meanwhile """
+    try:
+        created = write_variants(name)
+    except FileNotFoundError:
+        return
+    except Exception:
+        logger.exception('Generating variants of %s failed', name)
+        return
+    updated = Recipe.objects.filter(pk=recipe_id, image=name)\
+        .update(image_variants=created)
+    if updated:
+        CollectionVersion.objects.bump(user_id)
+
+
+def delete_image(name):
+    """ Remove an uploaded image with its variants """
+    if name:
+        shutil.rmtree(default_storage.path(posixpath.dirname(name)),
+                      ignore_errors=True)
+
+
+class VariantPool:
+    """ Runs variant generation on RECIPE_IMAGES['WORKERS'] threads.
+    Pillow releases the GIL while decoding, resizing and encoding, so
+    request threads keep running. Jobs are lost if the process dies,
+    generate_image_variants redoes those """
+
+    def __init__(self):
+        self._executor = LazyExecutor(thread_name_prefix='recipe-image')
+
+    def submit(self, func, *args):
+        workers = settings.RECIPE_IMAGES['WORKERS']
+        if not workers:
+            func(*args)
+        else:
+            self._executor.get(workers).submit(self._run, func, *args)
+
+    @staticmethod
+    def _run(func, *args):
+        try:
+            func(*args)
+        finally:
+            connections.close_all()
+
+
+variant_pool = VariantPool()
+
+
+def image_changed(recipe, replaced=''):
+    """ Once the transaction commits, delete the replaced image and
+    generate the variants of the new one off the request path """
+    name = recipe.image.name
+
+    def schedule():
+        delete_image(replaced)
+        if name:
+            variant_pool.submit(generate_variants, recipe.pk,
+                                recipe.user_id, name)
+
+    transaction.on_commit(schedule)
+
+
+def file_response(name):
+    """ Response sending a stored image. With a SENDFILE_HEADER the
+    front server sends the file and this process only the headers """
+    config = settings.RECIPE_IMAGES
+    header = config['SENDFILE_HEADER']
+    extension = posixpath.splitext(name)[1][1:]
+    content_type = next((content_type for ext, content_type
+                         in FORMATS.values() if ext == extension),
+                        'application/octet-stream')
+    if not header:
+        return FileResponse(default_storage.open(name),
+                            content_type=content_type)
+    response = HttpResponse(content_type=content_type)
+    if header.lower() == 'x-accel-redirect':
+        response[header] = config['SENDFILE_PREFIX'].rstrip('/') + \
+            '/' + name
+    else:
+        response[header] = default_storage.path(name)
+    return response
@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework import serializers
+
+from core.export import RELATIONS, chunks
+from core.models import Ingredient, Recipe, Tag
+from core.renderers import CSVRenderer, orjson
+
+# Same rules as the recipe API, built once instead of per row
+FIELDS = {
+    'title': serializers.CharField(max_length=255),
+    'price': serializers.DecimalField(max_digits=7, decimal_places=2),
+    'time_minutes': serializers.IntegerField(),
+    'link': serializers.CharField(max_length=255, allow_blank=True,
+                                  required=False, default=''),
+}
+MAX_NAME_LENGTH = Tag._meta.get_field('name').max_length
+RELATED_MODELS = {'tags': Tag, 'ingredients': Ingredient}
+
+
+class RowError(Exception):
+    """ An input row that can not be imported """
+
+    def __init__(self, line, detail):
+        self.line = line
+        self.detail = detail
+        super().__init__(f'line {line}: {detail}')
+
+
+def read_rows(stream, format):
+    """ Yield (line number, dict) from a binary NDJSON or CSV stream, as
+    written by export_recipes. CSV list cells are split on '|' """
+    if format == 'csv':
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8'))
+        for row in reader:
+            for field in RELATIONS:
+                value = row.get(field)
+                row[field] = value.split(CSVRenderer.LIST_SEPARATOR) \
+                    if value else []
+            yield reader.line_num, row
+        return
+
+    loads = orjson.loads if orjson is not None else json.loads
+    for line, data in enumerate(stream, 1):
+        if not data.strip():
+            continue
+        try:
+            yield line, loads(data)
+        except ValueError as exc:
+            raise RowError(line, f'invalid JSON ({exc})')
+
+
+def validate_row(line, row):
+    """ Field values of a row, validated like the API validates them """
+    if not isinstance(row, dict):
+        raise RowError(line, 'expected an object')
+    values, errors = {}, {}
+    for name, field in FIELDS.items():
+        try:
+            value = row.get(name, serializers.empty)
+            if value is None and not field.required:
+                value = serializers.empty
+            values[name] = field.run_validation(value)
+        except serializers.ValidationError as exc:
+            errors[name] = exc.detail
+    for name in RELATIONS:
+        try:
+            values[name] = validate_names(row.get(name))
+        except serializers.ValidationError as exc:
+            errors[name] = exc.detail
+    if errors:
+        raise RowError(line, errors)
+    return values
+
+
+def validate_names(names):
+    """ Tag or ingredient names, stripped like CharField does. Checked
+    by hand as ListField(CharField()) costs more than the insert itself """
+    if names is None:
+        return []
+    if not isinstance(names, list):
+        raise serializers.ValidationError('Expected a list of names.')
+    cleaned = []
+    for name in names:
+        if not isinstance(name, str):
+            raise serializers.ValidationError('Names must be strings.')
+        name = name.strip()
+        if not name or len(name) > MAX_NAME_LENGTH:
+            raise serializers.ValidationError(
+                f'Names must have 1 to {MAX_NAME_LENGTH} characters.'
+            )
+        cleaned.append(name)
+    return cleaned
+
+
+def resolve_names(model, user, names):
+    """ {lower case name: pk} of the user's tags or ingredients with the
+    given names, creating missing ones in one INSERT. Matching ignores
+    case like the unique (user, lower(name)) index """
+    wanted = {}
+    for name in names:
+        wanted.setdefault(name.lower(), name)
+    if not wanted:
+        return {}
+
+    def existing(keys):
+        return dict(
+            model.objects.annotate(lower_name=Lower('name'))
+            .filter(user=user, lower_name__in=keys)
+            .values_list('lower_name', 'id')
+        )
+
+    pks = existing(list(wanted))
+    missing = [key for key in wanted if key not in pks]
+    if missing:
+        # A concurrent import may create the same names, skip those
+        model.objects.bulk_create(
+            [model(user=user, name=wanted[key]) for key in missing],
+            ignore_conflicts=True,
+        )
+        pks.update(existing(missing))
+    return pks
+
+
+def import_batch(user, rows, batch_size=1000):
+    """ Create recipes from validated rows in one transaction, with their
+    tags and ingredients (by name) looked up or created in bulk """
+    with transaction.atomic():
+        pks = {
+            field: resolve_names(RELATED_MODELS[field], user, (
+                name for row in rows for name in row[field]
+            ))
+            for field in RELATIONS
+        }
+        return Recipe.objects.bulk_create_with_relations((
+            dict(row, user=user, **{
+                field: [pks[field][name.lower()] for name in row[field]]
+                for field in RELATIONS
+            })
+            for row in rows
+        ), batch_size=batch_size)
+
+
+def import_rows(user, rows, batch_size=2000):
+    """ Import (line, row) pairs in batches of batch_size, each committed
+    on its own. Yields (last line, recipes created) after every batch """
+    for batch in chunks(rows, batch_size):
+        recipes = import_batch(
+            user, [validate_row(line, row) for line, row in batch],
+            batch_size=batch_size,
+        )
+        yield batch[-1][0], len(recipes)
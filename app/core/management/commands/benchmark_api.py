@@ -0,0 +1,277 @@
+import http.client
+import json
+import platform
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.benchmark import compare, summarize, throughput
+from core.seed import SEED_PASSWORD, WORDS, seeded_users
+
+# Ids sampled per user for detail and update requests
+SAMPLE_SIZE = 1000
+
+Fixture = namedtuple('Fixture', 'email token recipes tags ingredients')
+
+
+class InProcessTransport:
+    """ Requests through Django's handler in this process, timing the
+    whole stack except the network and the WSGI server. While in use the
+    test client's host is allowed, like the test runner does, and the
+    authentication throttles are off, as every request comes from one
+    address """
+    name = 'in-process'
+
+    def __init__(self):
+        self.client = APIClient()
+        rest_framework = settings.REST_FRAMEWORK
+        self.settings = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            REST_FRAMEWORK=dict(rest_framework, DEFAULT_THROTTLE_RATES={
+                scope: None
+                for scope in rest_framework.get('DEFAULT_THROTTLE_RATES', {})
+            }),
+        )
+
+    def __enter__(self):
+        self.settings.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.settings.disable()
+
+    def request(self, method, path, data=None, token=None):
+        extra = {'HTTP_AUTHORIZATION': f'Token {token}'} if token else {}
+        res = self.client.generic(
+            method, path, json.dumps(data) if data is not None else '',
+            content_type='application/json', **extra
+        )
+        return res.status_code
+
+
+class HTTPTransport:
+    """ Requests to a running server over one keep-alive connection per
+    thread. Failed connections count as status 0 """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.name = url
+        self.connection_class = http.client.HTTPSConnection \
+            if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def connection(self):
+        if getattr(self.local, 'connection', None) is None:
+            self.local.connection = self.connection_class(self.netloc,
+                                                          timeout=30)
+        return self.local.connection
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Token {token}'
+        body = json.dumps(data) if data is not None else None
+        connection = self.connection()
+        try:
+            connection.request(method, self.prefix + path, body, headers)
+            res = connection.getresponse()
+            res.read()
+            return res.status
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self.local.connection = None
+            return 0
+
+
+def recipe_payload(fixture, rng):
+    return {
+        'title': f'{rng.choice(WORDS)} {rng.choice(WORDS)}',
+        'time_minutes': rng.randrange(5, 240),
+        'price': f'{rng.randrange(100, 100000) / 100:.2f}',
+        'tags': rng.sample(fixture.tags, min(3, len(fixture.tags))),
+        'ingredients': rng.sample(fixture.ingredients,
+                                  min(5, len(fixture.ingredients))),
+    }
+
+
+def detail(fixture, rng):
+    return reverse('recipe:recipe-detail', args=[rng.choice(fixture.recipes)])
+
+
+# name: function(fixture, rng) returning (method, path, data, token)
+SCENARIOS = {
+    'token': lambda f, rng: ('POST', reverse('user:token'),
+                             {'email': f.email, 'password': SEED_PASSWORD},
+                             None),
+    'me': lambda f, rng: ('GET', reverse('user:me'), None, f.token),
+    'recipe-list': lambda f, rng: ('GET', reverse('recipe:recipe-list'),
+                                   None, f.token),
+    'recipe-detail': lambda f, rng: ('GET', detail(f, rng), None, f.token),
+    'recipe-create': lambda f, rng: ('POST', reverse('recipe:recipe-list'),
+                                     recipe_payload(f, rng), f.token),
+    'recipe-update': lambda f, rng: ('PATCH', detail(f, rng),
+                                     {'title': rng.choice(WORDS)}, f.token),
+    'tag-list': lambda f, rng: ('GET', reverse('recipe:tag-list'), None,
+                                f.token),
+    'ingredient-list': lambda f, rng: (
+        'GET', reverse('recipe:ingredient-list'), None, f.token
+    ),
+}
+
+
+def load_fixtures(users):
+    """ Token and sampled recipe, tag and ingredient ids of each user """
+    fixtures = []
+    for user in users:
+        token, _ = Token.objects.get_or_create(user=user)
+        fixtures.append(Fixture(
+            email=user.email,
+            token=token.key,
+            recipes=list(user.recipe_set.values_list(
+                'pk', flat=True)[:SAMPLE_SIZE]),
+            tags=list(user.tag_set.values_list('pk', flat=True)[:SAMPLE_SIZE]),
+            ingredients=list(user.ingredient_set.values_list(
+                'pk', flat=True)[:SAMPLE_SIZE]),
+        ))
+    return fixtures
+
+
+def run_scenario(transport, scenario, fixtures, requests, concurrency=1,
+                 warmup=5, random_seed=0):
+    """ Send warmup untimed then requests timed calls of scenario, each
+    for a random user, concurrency at a time. Calls are planned up front
+    so every run sends the same sequence """
+    rng = random.Random(random_seed)
+    calls = [scenario(rng.choice(fixtures), rng)
+             for _ in range(warmup + requests)]
+    for call in calls[:warmup]:
+        transport.request(*call)
+
+    def send(call):
+        start = time.perf_counter()
+        status = transport.request(*call)
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        results = [send(call) for call in calls[warmup:]]
+    else:
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(send, calls[warmup:]))
+    elapsed = time.perf_counter() - start
+
+    stats = summarize([timing for timing, _ in results])
+    stats['rps'] = throughput(len(results), elapsed)
+    stats['errors'] = sum(1 for _, status in results
+                          if not 200 <= status < 400)
+    return stats
+
+
+class Command(BaseCommand):
+    """Django command timing the API scenarios against seeded users"""
+    help = 'Benchmark user and recipe endpoints, reporting percentiles ' \
+           'and throughput as JSON. Seed users with seed_data first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='load',
+                            help='Prefix of the seed_data users')
+        parser.add_argument('--users', type=int, default=10,
+                            help='How many seeded users to spread over')
+        parser.add_argument('--scenario', action='append',
+                            choices=sorted(SCENARIOS),
+                            help='Scenario to run, repeatable, default all')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--url',
+                            help='Base URL of a running server, requests '
+                                 'go through Django in-process otherwise')
+        parser.add_argument('--random-seed', type=int, default=0)
+        parser.add_argument('--label', default='',
+                            help='Free text stored with the results')
+        parser.add_argument('--output',
+                            help='Write the results JSON to this file')
+        parser.add_argument('--compare',
+                            help='Results JSON of a baseline run')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Percent p50/p95 growth over the baseline '
+                                 'treated as a regression')
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        if options['url']:
+            transport = HTTPTransport(options['url'])
+        elif options['concurrency'] > 1:
+            raise CommandError('--concurrency needs --url')
+        else:
+            transport = InProcessTransport()
+
+        users = seeded_users(options['prefix'])[:options['users']]
+        fixtures = load_fixtures(users)
+        if not fixtures or not all(f.recipes and f.tags for f in fixtures):
+            raise CommandError(
+                f'No {options["prefix"]} users with recipes and tags, run '
+                f'seed_data --prefix {options["prefix"]} first'
+            )
+
+        results = {
+            'label': options['label'],
+            'created_at': timezone.now().isoformat(),
+            'target': transport.name,
+            'concurrency': options['concurrency'],
+            'users': len(fixtures),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'scenarios': {},
+        }
+        with transport:
+            for name in options['scenario'] or list(SCENARIOS):
+                stats = run_scenario(
+                    transport, SCENARIOS[name], fixtures,
+                    options['requests'],
+                    concurrency=options['concurrency'],
+                    warmup=options['warmup'],
+                    random_seed=options['random_seed'],
+                )
+                results['scenarios'][name] = stats
+                self.stdout.write(json.dumps({'scenario': name, **stats}))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+        if options['compare']:
+            self.compare(options['compare'], results, options['threshold'])
+
+    def compare(self, path, results, threshold):
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+        rows = compare(baseline, results, threshold)
+        for row in rows:
+            self.stdout.write(json.dumps(row))
+        regressed = [row['scenario'] for row in rows if row['regressed']]
+        if regressed:
+            raise CommandError(
+                f'Slower than {path} by over {threshold}%: '
+                f'{", ".join(regressed)}'
+            )
@@ -0,0 +1,88 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import measure
+from core.models import Recipe
+from core.seed import seed
+from recipe.filters import filter_recipes
+
+BENCH_EMAIL = 'bench0@example.com'
+
+
+def join_filter(queryset, filters):
+    """ The naive alternative: chained joins plus DISTINCT to undo the
+    duplicated rows. Only used as a baseline """
+    for field in ('tags', 'ingredients'):
+        ids = filters.get(field) or ()
+        if filters['match'] == 'any' and ids:
+            queryset = queryset.filter(**{f'{field}__in': ids})
+        else:
+            for pk in ids:
+                queryset = queryset.filter(**{field: pk})
+    ranges = {k: v for k, v in filters.items()
+              if k not in ('tags', 'ingredients')}
+    queryset = filter_recipes(queryset, ranges)
+    return queryset.distinct()
+
+
+class Command(BaseCommand):
+    """Django command to time recipe filters on a large dataset"""
+    help = ('Time the recipe list filters against a seeded user, comparing '
+            'the EXISTS/IN subqueries with joins plus DISTINCT. The user '
+            'is seeded once and kept, so later runs start immediately.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000000)
+        parser.add_argument('--tags', type=int, default=200)
+        parser.add_argument('--ingredients', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--page-size', type=int,
+                            default=settings.REST_FRAMEWORK['PAGE_SIZE'])
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        user = self.get_user(options)
+        tags = list(user.tag_set.order_by('id').values_list('id', flat=True))
+        ingredients = list(user.ingredient_set.order_by('id')
+                           .values_list('id', flat=True))
+        cases = (
+            ('tags any', {'tags': tags[:2], 'match': 'any'}),
+            ('tags all', {'tags': tags[:2], 'match': 'all'}),
+            ('ingredients any', {'ingredients': ingredients[:3],
+                                 'match': 'any'}),
+            ('tags and ingredients', {'tags': tags[:1],
+                                      'ingredients': ingredients[:1],
+                                      'match': 'any'}),
+            ('time range', {'time_minutes_min': 30, 'time_minutes_max': 60,
+                            'match': 'any'}),
+            ('price range', {'price_min': 10, 'price_max': 20,
+                             'match': 'any'}),
+        )
+        queryset = Recipe.objects.filter(user=user)
+        page = options['page_size']
+        for name, filters in cases:
+            for strategy, apply in (('subquery', filter_recipes),
+                                    ('join', join_filter)):
+                filtered = apply(queryset, filters).order_by('-id')
+                stats = measure(lambda: list(filtered.all()[:page]),
+                                repeat=options['repeat'])
+                self.stdout.write(json.dumps(
+                    {'case': name, 'strategy': strategy, **stats}
+                ))
+
+    def get_user(self, options):
+        user = get_user_model().objects.filter(email=BENCH_EMAIL).first()
+        if user is not None:
+            return user
+        self.stdout.write(f'Seeding {options["recipes"]} recipes...')
+        user = seed(users=1, recipes=options['recipes'],
+                    tags=options['tags'],
+                    ingredients=options['ingredients'], prefix='bench')[0]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        return user
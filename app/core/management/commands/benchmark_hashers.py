@@ -0,0 +1,68 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import measure, throughput
+
+PASSWORD = 'benchmark-password'
+
+
+def available_hashers():
+    """ Configured hashers whose library is installed, preferred first """
+    hashers = []
+    for hasher in get_hashers():
+        try:
+            hasher.encode(PASSWORD, hasher.salt())
+        except ValueError:
+            continue
+        hashers.append(hasher)
+    return hashers
+
+
+def verify_throughput(hasher, encoded, threads, verifies):
+    """ Password checks per second with threads hashing at once """
+    with ThreadPoolExecutor(threads) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda _: hasher.verify(PASSWORD, encoded),
+                      range(verifies)))
+        return throughput(verifies, time.perf_counter() - start)
+
+
+class Command(BaseCommand):
+    """Django command timing password checks of each configured hasher"""
+    help = 'Time verifying a password with each configured hasher and ' \
+           'its costs, the CPU bound part of issuing a token'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--threads', type=int, action='append',
+                            help='Concurrent checks, repeatable, default '
+                                 '1 and the number of cores')
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        cores = os.cpu_count() or 1
+        thread_counts = options['threads'] or sorted({1, cores})
+        hashers = available_hashers()
+        if not hashers:
+            raise CommandError('No configured hasher can be loaded')
+        for hasher in hashers:
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+            stats = measure(lambda: hasher.verify(PASSWORD, encoded),
+                            repeat=options['repeat'], warmup=1)
+            for threads in thread_counts:
+                rate = verify_throughput(hasher, encoded, threads,
+                                         options['repeat'] * threads)
+                self.stdout.write(json.dumps({
+                    'hasher': hasher.algorithm,
+                    'threads': threads,
+                    **stats,
+                    'verifies_per_second': rate,
+                    'verifies_per_second_per_core': round(
+                        rate / min(threads, cores), 1
+                    ),
+                }))
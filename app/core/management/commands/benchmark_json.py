@@ -0,0 +1,64 @@
+import io
+import json
+import random
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.benchmark import measure
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+from core.seed import WORDS
+
+
+def recipe_payload(count, random_seed=0):
+    """ count recipes shaped like RecipeDetailSerializer output, with
+    Decimal prices as produced when COERCE_DECIMAL_TO_STRING is off """
+    rng = random.Random(random_seed)
+    return [
+        {
+            'id': n,
+            'title': f'{rng.choice(WORDS)} {rng.choice(WORDS)}',
+            'price': Decimal(rng.randrange(100, 100000)) / 100,
+            'time_minutes': rng.randrange(5, 240),
+            'tags': [{'id': rng.randrange(10000), 'name': rng.choice(WORDS)}
+                     for _ in range(3)],
+            'ingredients': [{'id': rng.randrange(10000),
+                             'name': rng.choice(WORDS)} for _ in range(5)],
+        }
+        for n in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    """Django command comparing the stdlib and orjson renderer/parser"""
+    help = 'Time rendering and parsing a list of recipes with each backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        if orjson is None:
+            raise CommandError('orjson is not installed')
+        data = recipe_payload(options['recipes'])
+        body = JSONRenderer().render(data)
+        for name, renderer, parser in (
+                ('json', JSONRenderer(), JSONParser()),
+                ('orjson', FastJSONRenderer(), FastJSONParser())):
+            for operation, func in (
+                    ('render', lambda: renderer.render(data)),
+                    ('parse', lambda: parser.parse(io.BytesIO(body)))):
+                stats = measure(func, repeat=options['repeat'])
+                stats['recipes_per_second'] = round(
+                    options['recipes'] / (stats['p50'] / 1000)
+                )
+                stats['mb_per_second'] = round(
+                    len(body) / 1e6 / (stats['p50'] / 1000), 1
+                )
+                self.stdout.write(json.dumps(
+                    {'backend': name, 'operation': operation, **stats}
+                ))
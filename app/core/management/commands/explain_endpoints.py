@@ -0,0 +1,148 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.models import Recipe
+from core.seed import seed
+from recipe import views
+
+
+def plan_nodes(node):
+    """ Walk an EXPLAIN (FORMAT JSON) plan depth first """
+    yield node
+    for child in node.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+def plan_problems(plan, max_sort_rows):
+    """ Return the reasons an EXPLAIN ANALYZE (FORMAT JSON) plan is
+    unacceptable: sequential scans reading more than max_sort_rows rows
+    (scanning a table that small beats an index), any sort spilling to
+    disk, and in-memory sorts whose input is larger than a page worth of
+    rows, i.e. sorts that grow with the size of a user's library """
+    problems = []
+    for node in plan_nodes(plan['Plan']):
+        kind = node['Node Type']
+        scanned = (node.get('Actual Rows', 0)
+                   + node.get('Rows Removed by Filter', 0)) * \
+            node.get('Actual Loops', 1)
+        if kind == 'Seq Scan' and scanned > max_sort_rows:
+            problems.append(f'sequential scan on {node["Relation Name"]}')
+        elif kind in ('Sort', 'Incremental Sort'):
+            child = node['Plans'][0]
+            rows = child['Actual Rows'] * child['Actual Loops']
+            if node.get('Sort Space Type') == 'Disk':
+                problems.append(f'on-disk sort of {rows} rows')
+            elif rows > max_sort_rows:
+                problems.append(f'in-memory sort of {rows} rows')
+    return problems
+
+
+class Command(BaseCommand):
+    """Django command to EXPLAIN ANALYZE the SQL every list and detail
+    endpoint runs against a seeded dataset"""
+    help = ('Seed a throwaway dataset, capture the SQL of each endpoint '
+            'and fail on sequential scans or sorts. Everything is rolled '
+            'back afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=200,
+                            help='Recipes per user')
+        parser.add_argument('--tags', type=int, default=1000,
+                            help='Tags per user')
+        parser.add_argument('--ingredients', type=int, default=1000,
+                            help='Ingredients per user')
+        parser.add_argument(
+            '--max-sort-rows', type=int,
+            default=settings.MAX_PAGE_SIZE * 5,
+            help='Largest sort input accepted, prefetching a page of '
+                 'tags and ingredients sorts a few rows per recipe'
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        if connection.vendor != 'postgresql':
+            raise CommandError('explain_endpoints needs PostgreSQL')
+
+        with transaction.atomic():
+            self.stdout.write('Seeding dataset...')
+            users = seed(
+                users=options['users'],
+                recipes=options['recipes'],
+                tags=options['tags'],
+                ingredients=options['ingredients'],
+                prefix='explain',
+            )
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            failures = self.explain_all(
+                users[len(users) // 2], options['max_sort_rows']
+            )
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{failures} endpoint queries need an index')
+        self.stdout.write(self.style.SUCCESS('All endpoint queries indexed'))
+
+    def endpoints(self, user):
+        recipe = Recipe.objects.filter(user=user).first()
+        tags = ','.join(str(pk) for pk in recipe.tags.values_list(
+            'pk', flat=True)[:2])
+        ingredient = recipe.ingredients.values_list('pk', flat=True)[0]
+        word = recipe.title.split()[0]
+        recipe_list = views.RecipeViewSet.as_view({'get': 'list'})
+        return (
+            ('recipe:recipe-list', recipe_list, {}, {}),
+            ('recipe:recipe-list?tags', recipe_list, {},
+             {'tags': tags, 'ingredients': ingredient}),
+            ('recipe:recipe-list?match=all', recipe_list, {},
+             {'tags': tags, 'match': 'all'}),
+            ('recipe:recipe-list?search', recipe_list, {},
+             {'search': word}),
+            ('recipe:recipe-detail',
+             views.RecipeViewSet.as_view({'get': 'retrieve'}),
+             {'pk': recipe.pk}, {}),
+            ('recipe:tag-list',
+             views.TagViewSet.as_view({'get': 'list'}), {}, {}),
+            ('recipe:tag-list?assigned_only',
+             views.TagViewSet.as_view({'get': 'list'}), {},
+             {'assigned_only': 1}),
+            ('recipe:tag-list?recipe_count',
+             views.TagViewSet.as_view({'get': 'list'}), {},
+             {'recipe_count': 1}),
+            ('recipe:ingredient-list',
+             views.IngredientViewSet.as_view({'get': 'list'}), {}, {}),
+        )
+
+    def explain_all(self, user, max_sort_rows):
+        factory = APIRequestFactory()
+        failures = 0
+        for name, view, kwargs, params in self.endpoints(user):
+            request = factory.get('/', params, HTTP_HOST='localhost')
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as ctx:
+                view(request, **kwargs).render()
+
+            for query in ctx.captured_queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'EXPLAIN (ANALYZE, FORMAT JSON) ' + query['sql']
+                    )
+                    plan = cursor.fetchone()[0][0]
+                problems = plan_problems(plan, max_sort_rows)
+                if problems:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(
+                        f'{name}: {", ".join(problems)}\n{query["sql"]}\n'
+                        f'{json.dumps(plan["Plan"], indent=2)}'
+                    ))
+                else:
+                    self.stdout.write(f'{name}: ok')
+        return failures
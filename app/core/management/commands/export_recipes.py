@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.export import export_recipes
+from core.models import Recipe
+from core.renderers import CSVRenderer, NDJSONRenderer
+
+RENDERERS = {r.format: r for r in (NDJSONRenderer, CSVRenderer)}
+
+
+class Command(BaseCommand):
+    """Django command to export a user's recipes as NDJSON or CSV"""
+    help = ('Write every recipe of a user with tag and ingredient names, '
+            'in the same format as GET /api/recipe/recipe/export/')
+
+    def add_arguments(self, parser):
+        parser.add_argument('email')
+        parser.add_argument('--format', choices=sorted(RENDERERS),
+                            default='ndjson')
+        parser.add_argument('--output', help='File to write, else stdout')
+        parser.add_argument('--chunk-size', type=int,
+                            default=settings.EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        user = get_user_model().objects.filter(
+            email=options['email'].lower()
+        ).first()
+        if user is None:
+            raise CommandError(f'No user {options["email"]}')
+
+        rows = export_recipes(Recipe.objects.filter(user=user),
+                              chunk_size=options['chunk_size'])
+        exported = 0
+
+        def counted():
+            nonlocal exported
+            for row in rows:
+                exported += 1
+                yield row
+
+        lines = RENDERERS[options['format']]().lines(counted())
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line.decode(), ending='')
+        self.stderr.write(f'Exported {exported} recipes')
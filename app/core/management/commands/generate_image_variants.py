@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.images import generate_variants
+from core.models import Recipe
+
+
+class Command(BaseCommand):
+    """Django command generating missing recipe image variants"""
+    help = 'Generate the RECIPE_IMAGES variants of recipe images missing ' \
+           'some, e.g. after a worker died or the variants changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Regenerate the variants of every image')
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        variants = sorted(settings.RECIPE_IMAGES['VARIANTS'])
+        recipes = Recipe.objects.exclude(image='')
+        if not options['all']:
+            recipes = recipes.exclude(image_variants__contains=variants)
+        done = 0
+        for pk, user_id, name in recipes.values_list(
+                'pk', 'user_id', 'image').iterator():
+            generate_variants(pk, user_id, name)
+            done += 1
+        self.stdout.write(f'Generated variants of {done} images')
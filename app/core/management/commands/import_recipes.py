@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+import time
+from itertools import dropwhile
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importer import RowError, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    """Django command to bulk import recipes for a user"""
+    help = ('Stream NDJSON or CSV recipes, as written by export_recipes, '
+            'into a user\'s library. Tags and ingredients are matched by '
+            'name and created when missing. Every batch is committed on '
+            'its own and recorded in --checkpoint, so a failed import '
+            'resumes after the last committed batch when run again.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('email')
+        parser.add_argument('path', help='Input file, - for stdin')
+        parser.add_argument('--format', choices=('ndjson', 'csv'),
+                            help='Defaults to the file extension, else '
+                                 'ndjson')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--checkpoint',
+                            help='JSON file recording the last committed '
+                                 'line, read on start to resume')
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        user = get_user_model().objects.filter(
+            email=options['email'].lower()
+        ).first()
+        if user is None:
+            raise CommandError(f'No user {options["email"]}')
+        path = options['path']
+        format = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'ndjson'
+        )
+        checkpoint = options['checkpoint']
+        done = self.read_checkpoint(checkpoint, path)
+        if done:
+            self.stdout.write(f'Resuming after line {done}')
+
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        imported, started = 0, time.monotonic()
+        try:
+            rows = dropwhile(lambda item: item[0] <= done,
+                             read_rows(stream, format))
+            for line, created in import_rows(user, rows,
+                                             options['batch_size']):
+                imported += created
+                self.write_checkpoint(checkpoint, path, line)
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self.stdout.write(
+                    f'line {line}: {imported} recipes, '
+                    f'{imported / elapsed:.0f} rows/s'
+                )
+        except RowError as exc:
+            raise CommandError(
+                f'{exc}. {imported} recipes were imported, rerun with the '
+                f'same --checkpoint after fixing the input to resume'
+            )
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} recipes in {elapsed:.1f}s '
+            f'({imported / elapsed:.0f} rows/s)'
+        ))
+
+    def read_checkpoint(self, checkpoint, path):
+        """Last committed line of path recorded in checkpoint, else 0"""
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint) as file:
+            state = json.load(file)
+        if state.get('path') != path:
+            raise CommandError(
+                f'{checkpoint} belongs to {state.get("path")}, not {path}'
+            )
+        return state['line']
+
+    def write_checkpoint(self, checkpoint, path, line):
+        """Atomically record line as the last committed one"""
+        if not checkpoint:
+            return
+        temporary = f'{checkpoint}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({'path': path, 'line': line}, file)
+        os.replace(temporary, checkpoint)
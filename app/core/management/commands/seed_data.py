@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Recipe
+from core.seed import SEED_PASSWORD, seed, seeded_users
+
+
+class Command(BaseCommand):
+    """Django command filling the database with benchmark users"""
+    help = 'Create users owning recipes, tags and ingredients, for ' \
+           'benchmark_api and manual load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--recipes', type=int, default=1000,
+                            help='Recipes per user')
+        parser.add_argument('--tags', type=int, default=50,
+                            help='Tags per user')
+        parser.add_argument('--ingredients', type=int, default=100,
+                            help='Ingredients per user')
+        parser.add_argument('--prefix', default='load',
+                            help='Users are <prefix><n>@example.com')
+        parser.add_argument('--random-seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete users of a previous run first')
+
+    def handle(self, *args, **options):
+        """Handle the command"""
+        users = seeded_users(options['prefix'])
+        with transaction.atomic():
+            if options['clear']:
+                users.delete()
+            elif users.exists():
+                raise CommandError(
+                    f'{options["prefix"]} users already exist, pass --clear '
+                    f'to replace them'
+                )
+            created = seed(
+                users=options['users'],
+                recipes=options['recipes'],
+                tags=options['tags'],
+                ingredients=options['ingredients'],
+                prefix=options['prefix'],
+                random_seed=options['random_seed'],
+            )
+        recipes = Recipe.objects.filter(user__in=created).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(created)} users and {recipes} recipes, '
+            f'password "{SEED_PASSWORD}"'
+        ))
@@ -1,22 +1,53 @@
+import random
 import time
 
-from django.db import connections
-from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+from core.health import check_database, check_cache, check_migrations
 
 
 class Command(BaseCommand):
     """Django command to pause execution until database is available"""
 
+    def add_arguments(self, parser):
+        parser.add_argument('--timeout', type=float, default=60,
+                            help='Give up after this many seconds')
+        parser.add_argument('--base-delay', type=float, default=0.5)
+        parser.add_argument('--max-delay', type=float, default=5)
+        parser.add_argument('--cache', action='store_true',
+                            help='Also wait for the default cache')
+        parser.add_argument('--migrations', action='store_true',
+                            help='Also wait until migrations are applied')
+
     def handle(self, *args, **options):
         """Handle the command"""
-        self.stdout.write('Waiting for database...')
-        db_conn = None
-        while not db_conn:
-            try:
-                db_conn = connections['default']
-            except OperationalError:
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
+        checks = [('Database', check_database)]
+        if options['cache']:
+            checks.append(('Cache', check_cache))
+        if options['migrations']:
+            checks.append(('Migrations', check_migrations))
 
-        self.stdout.write(self.style.SUCCESS('Database available!'))
+        deadline = time.monotonic() + options['timeout']
+        for name, check in checks:
+            self.stdout.write(f'Waiting for {name.lower()}...')
+            self.wait_for(name, check, deadline, options)
+            self.stdout.write(self.style.SUCCESS(f'{name} available!'))
+
+    def wait_for(self, name, check, deadline, options):
+        """Retry check with exponential backoff and full jitter"""
+        attempt = 0
+        while True:
+            try:
+                return check()
+            except Exception as exc:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(f'{name} unavailable: {exc}')
+                backoff = min(options['max_delay'],
+                              options['base_delay'] * 2 ** attempt)
+                delay = min(remaining, random.uniform(0, backoff))
+                self.stdout.write(
+                    f'{name} unavailable, waiting {delay:.2f} seconds...'
+                )
+                time.sleep(delay)
+                attempt += 1
@@ -0,0 +1,223 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.db import execute_wrapper
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+                    10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# name: (help, buckets, RequestMetrics attribute)
+HISTOGRAMS = {
+    'http_request_duration_seconds': (
+        'Wall time spent producing the response', DURATION_BUCKETS, 'wall'
+    ),
+    'http_request_db_duration_seconds': (
+        'Time spent executing SQL', DURATION_BUCKETS, 'db_time'
+    ),
+    'http_request_db_queries': (
+        'SQL queries executed', QUERY_BUCKETS, 'queries'
+    ),
+    'http_request_serializer_duration_seconds': (
+        'Time spent in serializer to_representation', DURATION_BUCKETS,
+        'serializer_time'
+    ),
+}
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """ Counters of the request being served """
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializing',
+                 'wall')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.wall = 0.0
+
+    def server_timing(self):
+        """ Server-Timing header value, durations in milliseconds """
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries",'
+            f' serializer;dur={self.serializer_time * 1000:.1f},'
+            f' total;dur={self.wall * 1000:.1f}'
+        )
+
+
+def current():
+    """ RequestMetrics of the current request, None when not recording """
+    return _current.get()
+
+
+class Histogram:
+    """ Cumulative buckets in the Prometheus sense, value <= bound """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """ (le, cumulative count) pairs ending with +Inf """
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    """ Per-endpoint histograms of one process. Each worker process keeps
+    its own, so scrape them individually or aggregate downstream """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._collectors = []
+
+    def add_collector(self, collect):
+        """ Render the exposition lines returned by collect() after the
+        histograms, for state kept elsewhere such as cache counters """
+        self._collectors.append(collect)
+
+    def observe(self, view, metrics):
+        with self._lock:
+            for name, (_, buckets, attribute) in HISTOGRAMS.items():
+                key = (name, view)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(buckets)
+                self._histograms[key].observe(getattr(metrics, attribute))
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        """ Prometheus text exposition format """
+        lines = []
+        with self._lock:
+            for name, (help_text, _, _) in HISTOGRAMS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, view), histogram in sorted(
+                        self._histograms.items()):
+                    if metric != name:
+                        continue
+                    label = f'view="{escape_label(view)}"'
+                    for bound, count in histogram.samples():
+                        lines.append(
+                            f'{name}_bucket{{{label},le="{bound}"}} {count}'
+                        )
+                    lines.append(f'{name}_sum{{{label}}} {histogram.sum}')
+                    lines.append(
+                        f'{name}_count{{{label}}} {histogram.count}'
+                    )
+        for collect in self._collectors:
+            lines.extend(collect())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')\
+        .replace('\n', '\\n')
+
+
+def record_query(execute, sql, params, many, context):
+    """ connection.execute_wrapper counting queries and their time """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries += 1
+
+
+@contextmanager
+def serializing():
+    """ Count the enclosed block as serializer time. Nested blocks, like a
+    serializer used inside another, are only counted once """
+    metrics = _current.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+        metrics.serializing = False
+
+
+class TimedSerializerMixin:
+    """ Count to_representation towards the request's serializer time.
+    Inlines serializing() as a ListSerializer calls it for every item """
+
+    def to_representation(self, instance):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+        metrics.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_time += time.perf_counter() - start
+            metrics.serializing = False
+
+
+def view_name(request):
+    """ Namespaced URL name of the resolved view, e.g. recipe:recipe-list """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name
+
+
+class MetricsMiddleware:
+    """ Record query count, DB, serializer and wall time of each request,
+    add them as a Server-Timing header and aggregate them per view into
+    registry. Removed from the stack unless settings.METRICS_ENABLED.
+
+    Streaming responses are timed up to their first byte """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with execute_wrapper(record_query):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.wall = time.perf_counter() - start
+
+        registry.observe(view_name(request), metrics)
+        response['Server-Timing'] = metrics.server_timing()
+        return response
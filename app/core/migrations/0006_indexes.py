@@ -0,0 +1,84 @@
+# Generated by Django 3.0.14 on 2026-10-18 19:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Min
+from django.db.models.functions import Lower
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """ Fold tags/ingredients that only differ by case into the oldest
+    row so the unique (user_id, lower(name)) index can be built """
+    Recipe = apps.get_model('core', 'Recipe')
+    for model_name, field in (('Tag', 'tags'), ('Ingredient', 'ingredients')):
+        model = apps.get_model('core', model_name)
+        through = getattr(Recipe, field).through
+        fk = f'{model_name.lower()}_id'
+        duplicates = model.objects.annotate(lower_name=Lower('name'))\
+            .values('user_id', 'lower_name')\
+            .annotate(keep=Min('id'), total=Count('id'))\
+            .filter(total__gt=1)
+        for group in duplicates:
+            dupes = model.objects.annotate(lower_name=Lower('name')).filter(
+                user_id=group['user_id'], lower_name=group['lower_name']
+            ).exclude(id=group['keep'])
+            for dupe_id in dupes.values_list('id', flat=True):
+                linked = through.objects.filter(**{fk: group['keep']})\
+                    .values('recipe_id')
+                links = through.objects.filter(**{fk: dupe_id})
+                links.filter(recipe_id__in=linked).delete()
+                links.update(**{fk: group['keep']})
+            dupes.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_auto_20200726_0647'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', 'name', 'id'], name='core_ingredient_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', 'id'], name='core_recipe_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'name', 'id'], name='core_tag_user_name_idx'),
+        ),
+        migrations.AlterField(
+            model_name='ingredient',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(merge_duplicate_names, migrations.RunPython.noop),
+        # The merge leaves deferred FK checks pending, which Postgres does
+        # not allow while building an index in the same transaction
+        migrations.RunSQL('SET CONSTRAINTS ALL IMMEDIATE',
+                          migrations.RunSQL.noop),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX core_tag_user_lower_name_uniq '
+            'ON core_tag (user_id, LOWER(name))',
+            'DROP INDEX core_tag_user_lower_name_uniq',
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX core_ingredient_user_lower_name_uniq '
+            'ON core_ingredient (user_id, LOWER(name))',
+            'DROP INDEX core_ingredient_user_lower_name_uniq',
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 3.0.14 on 2026-10-18 20:22
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+BACKFILL = '''
+UPDATE core_recipe r SET search_vector =
+    setweight(to_tsvector(%(config)s, r.title), 'A') ||
+    setweight(to_tsvector(%(config)s, COALESCE((
+        SELECT string_agg(t.name, ' ') FROM core_recipe_tags rt
+        JOIN core_tag t ON t.id = rt.tag_id WHERE rt.recipe_id = r.id
+    ), '')), 'B') ||
+    setweight(to_tsvector(%(config)s, COALESCE((
+        SELECT string_agg(i.name, ' ') FROM core_recipe_ingredients ri
+        JOIN core_ingredient i ON i.id = ri.ingredient_id
+        WHERE ri.recipe_id = r.id
+    ), '')), 'C')
+'''
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """ Same vector as RecipeQuerySet.update_search_vector, written out
+    so later changes to the model code can't alter this migration """
+    schema_editor.execute(BACKFILL, {
+        'config': getattr(settings, 'SEARCH_CONFIG', 'english'),
+    })
+
+
+def add_trigram_index(apps, schema_editor):
+    """ Typo tolerant title search needs pg_trgm, which is an optional
+    contrib module. Skip it where the server doesn't ship it, searches
+    then only use the full text index """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS core_recipe_title_trgm_idx '
+        'ON core_recipe USING gin (title gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    schema_editor.execute('DROP INDEX IF EXISTS core_recipe_title_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='core_recipe_search_idx'),
+        ),
+        migrations.RunPython(backfill_search_vectors,
+                             migrations.RunPython.noop),
+        migrations.RunPython(add_trigram_index, drop_trigram_index),
+    ]
@@ -1,16 +1,31 @@
+import io
+import os
+import uuid
+
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
     PermissionsMixin
-from django.db import models
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import connections, models, transaction
+from django.db.models import F, OuterRef, Subquery
 from django.conf import settings
+from django.utils import timezone
 
 
 class UserManager(BaseUserManager):
 
+    @classmethod
+    def normalize_email(cls, email):
+        """ Emails are stored lowercased as a whole """
+        return email.lower()
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('User must have valid Email')
         """creates and saves a new user"""
-        user = self.model(email=email.lower(), **extra_fields)
+        user = self.model(email=self.normalize_email(email), **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
         return user
@@ -35,13 +50,49 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
 
 
+class CollectionVersionManager(models.Manager):
+
+    def bump(self, *user_ids, create=True):
+        """ Mark the recipes, tags and ingredients of users as changed """
+        now = timezone.now()
+        for user_id in set(user_ids):
+            updated = self.filter(user_id=user_id).update(
+                version=F('version') + 1, updated_at=now
+            )
+            if not updated and create:
+                self.get_or_create(user_id=user_id,
+                                   defaults={'updated_at': now})
+
+
+class CollectionVersion(models.Model):
+    """ Counter bumped whenever anything a user's recipe endpoints
+    render changes, so conditional requests are answered from one row """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    version = models.BigIntegerField(default=1)
+    updated_at = models.DateTimeField()
+
+    objects = CollectionVersionManager()
+
+
 class Tag(models.Model):
     """ Tag model for a recipe """
     name = models.CharField(max_length=255)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'name', 'id'],
+                         name='core_tag_user_name_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name}'
@@ -51,26 +102,143 @@ class Ingredient(models.Model):
     name = models.CharField(max_length=255)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'name', 'id'],
+                         name='core_ingredient_user_name_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name}'
 
 
+class RecipeQuerySet(models.QuerySet):
+
+    def update_search_vector(self, **fields):
+        """ Recompute search_vector from the title (weight A), tag names
+        (B) and ingredient names (C) with a single UPDATE, which also sets
+        any other given fields """
+        config = getattr(settings, 'SEARCH_CONFIG', 'english')
+        vector = SearchVector('title', weight='A', config=config)
+        for field, weight in (('tags', 'B'), ('ingredients', 'C')):
+            vector += SearchVector(self._related_names(field),
+                                   weight=weight, config=config)
+        return self.update(search_vector=vector, **fields)
+
+    def _related_names(self, field):
+        """ Space separated names linked to each recipe through field """
+        m2m = self.model._meta.get_field(field)
+        name = f'{m2m.m2m_reverse_field_name()}__name'
+        names = m2m.remote_field.through.objects\
+            .filter(recipe_id=OuterRef('pk'))\
+            .values('recipe_id')\
+            .annotate(names=StringAgg(name, ' '))\
+            .values('names')
+        return Subquery(names, output_field=models.TextField())
+
+
+class RecipeManager(models.Manager.from_queryset(RecipeQuerySet)):
+
+    def bulk_create_with_relations(self, rows, batch_size=1000):
+        """ Insert recipes from dicts of field values, each with optional
+        'tags' and 'ingredients' lists (objects or pks), using one INSERT
+        per table and batch inside a single transaction. No signals are
+        sent, so the search vectors and the owners' CollectionVersion are
+        updated here """
+        recipes, tag_links, ingredient_links = [], [], []
+        for row in rows:
+            row = dict(row)
+            tag_links.append(row.pop('tags', ()))
+            ingredient_links.append(row.pop('ingredients', ()))
+            recipes.append(self.model(**row))
+
+        with transaction.atomic(using=self.db):
+            self.bulk_create(recipes, batch_size=batch_size)
+            for field, links in (('tags', tag_links),
+                                 ('ingredients', ingredient_links)):
+                self._bulk_link(field, recipes, links, batch_size)
+            self.filter(pk__in=[recipe.pk for recipe in recipes])\
+                .update_search_vector()
+            CollectionVersion.objects.db_manager(self.db).bump(
+                *(recipe.user_id for recipe in recipes)
+            )
+        return recipes
+
+    def _bulk_link(self, field, recipes, links, batch_size):
+        """ Insert the M2M through rows of field for each recipe. PostgreSQL
+        gets them through COPY, several times faster than INSERTs for
+        large imports. The recipes are new so no row can conflict """
+        through = getattr(self.model, field).through
+        column = self.model._meta.get_field(field).m2m_reverse_field_name()
+        pairs = [
+            (recipe.pk, pk)
+            for recipe, objs in zip(recipes, links)
+            for pk in dict.fromkeys(getattr(obj, 'pk', obj) for obj in objs)
+        ]
+        connection = connections[self.db]
+        if not pairs:
+            return
+        if connection.vendor != 'postgresql':
+            through.objects.using(self.db).bulk_create([
+                through(recipe_id=recipe_id, **{f'{column}_id': pk})
+                for recipe_id, pk in pairs
+            ], batch_size=batch_size)
+            return
+
+        quote = connection.ops.quote_name
+        data = io.StringIO(''.join(f'{r}\t{pk}\n' for r, pk in pairs))
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(through._meta.db_table)} '
+                f'({quote("recipe_id")}, {quote(column + "_id")}) '
+                f'FROM STDIN', data
+            )
+
+
+def recipe_image_file_path(instance, filename):
+    """ A new directory per upload, holding the original and its
+    variants, see core.images """
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join('uploads', 'recipe', uuid.uuid4().hex,
+                        f'original{ext}')
+
+
 class Recipe(models.Model):
     """ Recipe Object """
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
     title = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=7, decimal_places=2)
     time_minutes = models.IntegerField()
     link = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    image = models.FileField(upload_to=recipe_image_file_path, blank=True,
+                             max_length=255)
+    # Names of the generated RECIPE_IMAGES['VARIANTS'] of image
+    image_variants = ArrayField(models.CharField(max_length=20),
+                                default=list, blank=True, editable=False)
 
     tags = models.ManyToManyField('Tag')
     ingredients = models.ManyToManyField('Ingredient')
 
+    objects = RecipeManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'],
+                         name='core_recipe_user_id_idx'),
+            GinIndex(fields=['search_vector'],
+                     name='core_recipe_search_idx'),
+        ]
+
     def __str__(self):
         return self.title
@@ -0,0 +1,166 @@
+import logging
+import os
+import re
+import sys
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework import status
+
+from core.db import execute_wrapper
+from core.metrics import view_name
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SAVEPOINT = re.compile(r'"s\d+_x\d+"')
+_IN_LIST = re.compile(r'\bIN \(\?(?:, \?)*\)')
+_SPACE = re.compile(r'\s+')
+
+# Transaction bookkeeping repeats legitimately, e.g. one savepoint per
+# atomic block
+IGNORED = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+Duplicate = namedtuple('Duplicate', 'fingerprint count origin')
+
+
+class DuplicateQueriesError(Exception):
+    """ A request repeated the same query more often than allowed """
+
+
+def fingerprint(sql):
+    """ sql with literals, placeholders and IN lists of any length folded
+    into ?, so queries differing only in their values compare equal """
+    sql = _STRING.sub('?', sql).replace('%s', '?')
+    sql = _SAVEPOINT.sub('?', _NUMBER.sub('?', sql))
+    return _IN_LIST.sub('IN (...)', _SPACE.sub(' ', sql).strip())
+
+
+def origin():
+    """ 'path:line in function' of the innermost project frame running
+    the query, skipping installed packages and this module """
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(settings.BASE_DIR) and \
+                'site-packages' not in filename and filename != __file__:
+            path = os.path.relpath(filename, settings.BASE_DIR)
+            return f'{path}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+class QueryTracker:
+    """ execute_wrapper counting the queries of each fingerprint. The
+    stack is only walked when a fingerprint repeats for the first time """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.startswith(IGNORED):
+            key = fingerprint(sql)
+            self.counts[key] += 1
+            if self.counts[key] == 2:
+                self.origins[key] = origin()
+        return execute(sql, params, many, context)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def duplicates(self, threshold):
+        """ Fingerprints executed more than threshold times, most first """
+        return [
+            Duplicate(key, count, self.origins.get(key))
+            for key, count in self.counts.most_common()
+            if count > threshold
+        ]
+
+
+@contextmanager
+def track_queries():
+    """ Yield a QueryTracker recording queries on every database """
+    tracker = QueryTracker()
+    with execute_wrapper(tracker):
+        yield tracker
+
+
+def report(duplicates):
+    return '\n'.join(
+        f'{d.count}x from {d.origin or "unknown"}: {d.fingerprint}'
+        for d in duplicates
+    )
+
+
+class QueryCheckMiddleware:
+    """ Log requests repeating a query fingerprint more than
+    QUERY_CHECK['THRESHOLD'] times, usually an N+1 in a serializer.
+    With QUERY_CHECK['RAISE'] they fail instead, for test and staging
+    runs. Removed from the stack unless QUERY_CHECK['ENABLED'] """
+
+    def __init__(self, get_response):
+        options = getattr(settings, 'QUERY_CHECK', {})
+        if not options.get('ENABLED'):
+            raise MiddlewareNotUsed
+        self.threshold = options.get('THRESHOLD', 5)
+        self.raise_error = options.get('RAISE', False)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_queries() as tracker:
+            response = self.get_response(request)
+        duplicates = tracker.duplicates(self.threshold)
+        if not duplicates or \
+                response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+            return response
+
+        message = f'{view_name(request)} repeated queries\n' \
+                  f'{report(duplicates)}'
+        if self.raise_error:
+            raise DuplicateQueriesError(message)
+        logger.warning(message)
+        return response
+
+
+class QueryCheckMixin:
+    """ TestCase helpers catching queries that grow with the number of
+    rows an endpoint returns. Expects an APIClient in self.client """
+    query_threshold = 1
+
+    @contextmanager
+    def assertNoDuplicateQueries(self, threshold=None):
+        """ Fail when the block repeats a fingerprint more than threshold
+        times, reporting where each repeated query came from """
+        if threshold is None:
+            threshold = self.query_threshold
+        with track_queries() as tracker:
+            yield tracker
+        duplicates = tracker.duplicates(threshold)
+        if duplicates:
+            self.fail(f'Repeated queries:\n{report(duplicates)}')
+
+    def count_queries(self, url):
+        with track_queries() as tracker:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return tracker
+
+    def assertConstantQueries(self, url, add_rows, sizes=(1, 5, 20)):
+        """ Grow the dataset through add_rows(n) and check that every
+        request to url costs the same number of queries """
+        trackers = []
+        for size in sizes:
+            add_rows(size)
+            trackers.append(self.count_queries(url))
+        counts = [tracker.total for tracker in trackers]
+        if len(set(counts)) > 1:
+            self.fail(
+                f'query count grows with result size: {counts}\n'
+                f'{report(trackers[-1].duplicates(self.query_threshold))}'
+            )
+        return counts[0]
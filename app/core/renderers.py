@@ -0,0 +1,133 @@
+import csv
+from decimal import Decimal
+
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class DecimalJSONEncoder(JSONEncoder):
+    """ DRF's JSONEncoder with Decimals as strings, so prices keep every
+    digit instead of going through float """
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+_encoder = DecimalJSONEncoder()
+
+
+def default(obj):
+    """ Types orjson does not know, encoded like the stdlib fallback """
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """ JSONRenderer backed by orjson. Falls back to the stdlib renderer
+    when orjson is not installed or for output orjson cannot produce:
+    indented (e.g. the browsable API), ASCII only or non compact JSON.
+    Both paths render Decimals as strings """
+    encoder_class = DecimalJSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type,
+                                 renderer_context or {})
+        if (orjson is None or indent is not None or self.ensure_ascii
+                or not self.compact):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        ret = orjson.dumps(data, default=default, option=(
+            orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        ))
+        # Same escaping as JSONRenderer, keeping the output a valid
+        # javascript subset
+        if b'\xe2\x80' in ret:
+            ret = ret.replace('\u2028'.encode(), b'\\u2028')\
+                .replace('\u2029'.encode(), b'\\u2029')
+        return ret
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """ Newline delimited JSON, one object per line. lines() renders an
+    iterable lazily for streaming responses """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.lines(data if isinstance(data, list)
+                                   else [data]))
+
+    def lines(self, items):
+        renderer = FastJSONRenderer()
+        for item in items:
+            yield renderer.render(item) + b'\n'
+
+
+class PassthroughRenderer(renderers.BaseRenderer):
+    """ Accepts any media type for actions answering with a file
+    response of their own. Error responses render empty """
+    media_type = '*/*'
+    format = None
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b''
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    """ CSV with a header taken from the first item's keys. List values
+    are joined with LIST_SEPARATOR. lines() renders an iterable lazily
+    for streaming responses """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+    LIST_SEPARATOR = '|'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.lines(data if isinstance(data, list)
+                                   else [data]))
+
+    def lines(self, items):
+        buffer = _LineBuffer()
+        writer = csv.writer(buffer)
+        header = None
+        for item in items:
+            if header is None:
+                header = list(item)
+                writer.writerow(header)
+                yield buffer.pop()
+            writer.writerow([self.cell(item.get(key)) for key in header])
+            yield buffer.pop()
+
+    def cell(self, value):
+        if isinstance(value, (list, tuple)):
+            return self.LIST_SEPARATOR.join(str(v) for v in value)
+        return '' if value is None else value
+
+
+class _LineBuffer:
+    """ File-like object handing csv.writer rows back as bytes """
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, value):
+        self.parts.append(value)
+
+    def pop(self):
+        line = ''.join(self.parts).encode()
+        self.parts.clear()
+        return line
@@ -0,0 +1,94 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, \
+    pre_delete
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.images import delete_image
+from core.models import CollectionVersion, Ingredient, Recipe, Tag
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def bump_on_save(sender, instance, **kwargs):
+    """ A saved recipe, tag or ingredient changes what the owner's list
+    and detail endpoints return """
+    CollectionVersion.objects.bump(instance.user_id)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def bump_on_delete(sender, instance, **kwargs):
+    """ Deleting a user cascades here, possibly after its version row is
+    gone, so never create one. Without a row nothing can be cached """
+    CollectionVersion.objects.bump(instance.user_id, create=False)
+
+
+@receiver(post_save, sender=Recipe)
+def index_recipe(sender, instance, update_fields=None, **kwargs):
+    """ Keep the search vector in line with the title """
+    if update_fields is None or 'title' in update_fields:
+        Recipe.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def index_renamed(sender, instance, created, update_fields=None,
+                  **kwargs):
+    """ Renaming a tag or ingredient changes its recipes' vectors """
+    if created or (update_fields is not None and 'name' not in update_fields):
+        return
+    Recipe.objects.filter(pk__in=instance.recipe_set.values('pk'))\
+        .update_search_vector()
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def remember_deleted_links(sender, instance, **kwargs):
+    """ The links are gone by post_delete, note the recipes now """
+    instance._linked_recipes = list(
+        instance.recipe_set.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def index_deleted(sender, instance, **kwargs):
+    """ Drop a deleted tag or ingredient from its recipes' vectors """
+    recipes = getattr(instance, '_linked_recipes', None)
+    if recipes:
+        Recipe.objects.filter(pk__in=recipes).update_search_vector()
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def relation_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Adding or removing tags and ingredients changes the recipe: touch
+    updated_at, rebuild the search vector and bump the version """
+    if action == 'pre_clear' and reverse:
+        # Clears send no pk_set, note which recipes are about to change
+        instance._linked_recipes = list(
+            instance.recipe_set.values_list('pk', flat=True)
+        )
+        return
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        recipe_ids = [instance.pk]
+    elif action == 'post_clear':
+        recipe_ids = getattr(instance, '_linked_recipes', [])
+    else:
+        recipe_ids = pk_set or []
+    Recipe.objects.filter(user_id=instance.user_id, pk__in=recipe_ids)\
+        .update_search_vector(updated_at=timezone.now())
+    CollectionVersion.objects.bump(instance.user_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_recipe_image(sender, instance, **kwargs):
+    """ Remove the image files once the deletion is committed """
+    if instance.image:
+        name = instance.image.name
+        transaction.on_commit(lambda: delete_image(name))
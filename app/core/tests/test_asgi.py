@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import path
+
+from core.asgi import ThreadPoolASGIHandler
+
+running = []
+barrier = threading.Barrier(2, timeout=5)
+
+
+def wait_view(request):
+    """Waits until another request is in the view too"""
+    barrier.wait()
+    return HttpResponse(threading.current_thread().name)
+
+
+def count_view(request):
+    """Records how many requests are in the view at once"""
+    running.append(object())
+    peak = len(running)
+    threading.Event().wait(0.02)
+    running.pop()
+    return HttpResponse(str(peak))
+
+
+urlpatterns = [
+    path('wait/', wait_view),
+    path('count/', count_view),
+]
+
+
+async def call(application, url):
+    """Status and body of a GET of url through the ASGI application"""
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': 'GET',
+        'path': url, 'raw_path': url.encode(), 'root_path': '',
+        'scheme': 'http', 'query_string': b'',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 5000), 'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    body = b''.join(m.get('body', b'') for m in messages[1:])
+    return messages[0]['status'], body.decode()
+
+
+async def call_many(application, url, times):
+    return await asyncio.gather(*(call(application, url)
+                                  for _ in range(times)))
+
+
+@override_settings(ROOT_URLCONF='core.tests.test_asgi')
+class ThreadPoolASGIHandlerTests(SimpleTestCase):
+
+    def test_requests_run_in_parallel(self):
+        """Test requests run on pool threads at the same time"""
+        barrier.reset()
+
+        results = asyncio.run(call_many(ThreadPoolASGIHandler(threads=2),
+                                        '/wait/', 2))
+
+        self.assertEqual([status for status, _ in results], [200, 200])
+        names = {body for _, body in results}
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all(name.startswith('asgi') for name in names))
+
+    def test_threads_bound_running_requests(self):
+        """Test no more requests than threads run at once"""
+        results = asyncio.run(call_many(ThreadPoolASGIHandler(threads=2),
+                                        '/count/', 6))
+
+        self.assertEqual(max(int(body) for _, body in results), 2)
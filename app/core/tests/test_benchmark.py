@@ -0,0 +1,49 @@
+from django.test import SimpleTestCase
+
+from core.benchmark import compare, measure, percentile
+
+
+class BenchmarkTests(SimpleTestCase):
+
+    def test_percentile_nearest_rank(self):
+        """Test percentiles pick an observed value by nearest rank"""
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_measure_reports_milliseconds(self):
+        """Test measure skips warmup calls and reports in milliseconds"""
+        ticks = iter(range(100))
+        calls = []
+
+        stats = measure(lambda: calls.append(1), repeat=3, warmup=2,
+                        clock=lambda: next(ticks) / 1000)
+
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(stats['runs'], 3)
+        self.assertEqual(stats['p50'], 1.0)
+
+    def test_compare_flags_regressions(self):
+        """Test p50 or p95 growth over the threshold is a regression"""
+        baseline = {'scenarios': {
+            'me': {'p50': 10, 'p95': 20, 'p99': 30, 'rps': 100},
+            'token': {'p50': 10, 'p95': 20, 'p99': 30, 'rps': 100},
+            'dropped': {'p50': 1, 'p95': 1, 'p99': 1, 'rps': 1},
+        }}
+        current = {'scenarios': {
+            'me': {'p50': 10.5, 'p95': 19, 'p99': 60, 'rps': 95},
+            'token': {'p50': 10, 'p95': 23, 'p99': 30, 'rps': 90},
+            'new': {'p50': 1, 'p95': 1, 'p99': 1, 'rps': 1},
+        }}
+
+        rows = compare(baseline, current, threshold=10)
+
+        self.assertEqual(rows, [
+            {'scenario': 'me', 'p50': 5.0, 'p95': -5.0, 'p99': 100.0,
+             'rps': -5.0, 'regressed': False},
+            {'scenario': 'token', 'p50': 0.0, 'p95': 15.0, 'p99': 0.0,
+             'rps': -10.0, 'regressed': True},
+        ])
@@ -0,0 +1,112 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from core.cache import LazyExecutor, LRUCache, RedisCache, SingleFlight, \
+    build_cache
+
+
+class FakeRedis:
+    """Stand-in for a redis.Redis client keeping bytes in a dict"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        assert isinstance(value, bytes)
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class RedisCacheTests(SimpleTestCase):
+
+    def test_round_trip_with_prefix_and_ttl(self):
+        """Test values are pickled under the prefix with the default ttl"""
+        client = FakeRedis()
+        cache = RedisCache(client, ttl=30, prefix='app:')
+
+        cache.set('key', {'a': [1, 2]})
+
+        self.assertEqual(cache.get('key'), {'a': [1, 2]})
+        self.assertEqual(client.expiry, {'app:key': 30})
+        cache.delete('key')
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.get('key', 'default'), 'default')
+
+    def test_build_cache(self):
+        """Test the backend is chosen from settings"""
+        self.assertIsInstance(build_cache({}), LRUCache)
+        with patch.dict('sys.modules', {'redis': None}):
+            with self.assertRaises(ImproperlyConfigured):
+                build_cache({'BACKEND': 'redis', 'URL': 'redis://x'})
+
+
+class SingleFlightTests(SimpleTestCase):
+
+    def test_concurrent_calls_share_one_result(self):
+        """Test callers arriving during a call wait for its result"""
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return 'value'
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(flight.do('key', slow))
+        )
+        leader.start()
+        started.wait()
+        followers = [
+            threading.Thread(
+                target=lambda: results.append(flight.do('key', slow))
+            )
+            for _ in range(5)
+        ]
+        for thread in followers:
+            thread.start()
+        for thread in [leader] + followers:
+            thread.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ['value'] * 6)
+
+    def test_errors_are_not_cached(self):
+        """Test a failed call is retried by the next caller"""
+        flight = SingleFlight()
+
+        with self.assertRaises(ValueError):
+            flight.do('key', lambda: int('x'))
+
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+
+
+class LazyExecutorTests(SimpleTestCase):
+
+    def test_threads_started_on_first_use_only(self):
+        """Test no thread runs before the first get, then one pool"""
+        before = threading.active_count()
+        lazy = LazyExecutor(thread_name_prefix='lazy-test')
+
+        self.assertEqual(threading.active_count(), before)
+        executor = lazy.get(1)
+        name = executor.submit(lambda: threading.current_thread().name)
+
+        self.assertTrue(name.result().startswith('lazy-test'))
+        self.assertIs(lazy.get(1), executor)
+        executor.shutdown()
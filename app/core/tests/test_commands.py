@@ -1,22 +1,343 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
 from unittest.mock import patch
 
+from core.management.commands.explain_endpoints import plan_problems
+from core.models import Ingredient, Recipe, Tag
+from core.seed import seeded_users
+
 
 class CommandTestCase(TestCase):
 
-    def test_wait_for_db_ready(self):
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command("wait_for_db")
-            self.assertEqual(gi.call_count, 1)
+    @patch('core.management.commands.wait_for_db.check_database')
+    def test_wait_for_db_ready(self, check):
+        call_command("wait_for_db")
+        self.assertEqual(check.call_count, 1)
 
     @patch('time.sleep', return_value=None)
-    def test_wait_for_db(self, ts):
+    @patch('core.management.commands.wait_for_db.check_database')
+    def test_wait_for_db(self, check, ts):
         """Test waiting for db"""
+        check.side_effect = [OperationalError] * 5 + [None]
+        call_command("wait_for_db")
+        self.assertEqual(check.call_count, 6)
+        self.assertEqual(ts.call_count, 5)
+
+    @patch('time.sleep', return_value=None)
+    @patch('core.management.commands.wait_for_db.check_database')
+    def test_wait_for_db_backoff_grows(self, check, ts):
+        """Test retry delays back off exponentially up to max-delay"""
+        check.side_effect = [OperationalError] * 6 + [None]
+        with patch('random.uniform', side_effect=lambda low, high: high):
+            call_command("wait_for_db", base_delay=1, max_delay=8)
+        delays = [c.args[0] for c in ts.call_args_list]
+        self.assertEqual(delays, [1, 2, 4, 8, 8, 8])
+
+    @patch('time.sleep', return_value=None)
+    @patch('core.management.commands.wait_for_db.check_database')
+    def test_wait_for_db_deadline(self, check, ts):
+        """Test the command fails once the timeout has passed"""
+        check.side_effect = OperationalError('connection refused')
+        with self.assertRaises(CommandError):
+            call_command("wait_for_db", timeout=0)
+
+    @patch('core.management.commands.wait_for_db.check_migrations')
+    @patch('core.management.commands.wait_for_db.check_cache')
+    @patch('core.management.commands.wait_for_db.check_database')
+    def test_wait_for_cache_and_migrations(self, db, cache, migrations):
+        """Test cache and migration checks only run when requested"""
+        call_command("wait_for_db")
+        self.assertFalse(cache.called or migrations.called)
+
+        call_command("wait_for_db", cache=True, migrations=True)
+        self.assertTrue(cache.called and migrations.called)
+
+
+class HealthEndpointTests(TestCase):
+
+    def test_healthz(self):
+        """Test liveness answers without touching dependencies"""
+        with self.assertNumQueries(0):
+            res = self.client.get(reverse('healthz'))
+        self.assertEqual(res.status_code, 200)
+
+    def test_readyz_ok(self):
+        """Test readiness passes against the migrated test database"""
+        res = self.client.get(reverse('readyz'))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['checks'], {
+            'database': 'ok', 'cache': 'ok', 'migrations': 'ok'
+        })
+
+    def test_readyz_database_down(self):
+        """Test readiness reports 503 when the database is unreachable"""
+        with patch('core.views.check_database',
+                   side_effect=OperationalError('connection refused')):
+            with self.assertLogs('core.health', 'ERROR') as logs:
+                res = self.client.get(reverse('readyz'))
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.json()['checks']['database'], 'unavailable')
+        self.assertNotIn('connection refused', res.content.decode())
+        self.assertIn('connection refused', logs.output[0])
+
+
+def plan(node_type, rows=10, **extra):
+    node = {'Node Type': node_type, 'Actual Rows': rows, 'Actual Loops': 1}
+    node.update(extra)
+    return node
+
+
+class ExplainEndpointsTestCase(TestCase):
+
+    def test_index_scan_plan_accepted(self):
+        """Test a plan reading through indexes has no problems"""
+        tree = {'Plan': plan('Limit', Plans=[
+            plan('Index Scan', **{'Relation Name': 'core_recipe'})
+        ])}
+        self.assertEqual(plan_problems(tree, max_sort_rows=100), [])
+
+    def test_seq_scan_rejected(self):
+        """Test a nested sequential scan is reported"""
+        tree = {'Plan': plan('Hash Join', Plans=[
+            plan('Index Scan', **{'Relation Name': 'core_recipe_tags'}),
+            plan('Hash', Plans=[
+                plan('Seq Scan', rows=10, **{'Relation Name': 'core_tag',
+                                             'Rows Removed by Filter': 991})
+            ]),
+        ])}
+        self.assertEqual(plan_problems(tree, max_sort_rows=100),
+                         ['sequential scan on core_tag'])
+
+    def test_seq_scan_of_small_table_accepted(self):
+        """Test scanning fewer rows than a sort would be allowed is fine"""
+        tree = {'Plan': plan('Seq Scan', rows=1, **{
+            'Relation Name': 'core_collectionversion',
+            'Rows Removed by Filter': 99,
+        })}
+        self.assertEqual(plan_problems(tree, max_sort_rows=100), [])
+
+    def test_large_and_disk_sorts_rejected(self):
+        """Test sorts bigger than a page or spilling to disk are reported"""
+        small = {'Plan': plan('Sort', Plans=[plan('Index Scan', rows=50)])}
+        large = {'Plan': plan('Sort', Plans=[plan('Index Scan', rows=500)])}
+        disk = {'Plan': plan('Sort', Plans=[plan('Index Scan', rows=5)],
+                             **{'Sort Space Type': 'Disk'})}
+
+        self.assertEqual(plan_problems(small, max_sort_rows=100), [])
+        self.assertEqual(plan_problems(large, max_sort_rows=100),
+                         ['in-memory sort of 500 rows'])
+        self.assertEqual(plan_problems(disk, max_sort_rows=100),
+                         ['on-disk sort of 5 rows'])
+
+
+class ExportRecipesTestCase(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'ansuman@yopmail.com', 'ansuman123'
+        )
+        recipe = Recipe.objects.create(user=self.user, title='Dal',
+                                       time_minutes=5, price=2)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+    def test_export_to_stdout(self):
+        """Test recipes are written as NDJSON to stdout"""
+        out, err = StringIO(), StringIO()
+        call_command('export_recipes', 'Ansuman@yopmail.com',
+                     stdout=out, stderr=err)
+
+        row = json.loads(out.getvalue())
+        self.assertEqual((row['title'], row['tags']), ('Dal', ['Vegan']))
+        self.assertIn('Exported 1 recipes', err.getvalue())
+
+    def test_export_csv_to_file(self):
+        """Test --format csv --output writes a CSV file"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'recipes.csv')
+            call_command('export_recipes', 'ansuman@yopmail.com',
+                         format='csv', output=path, stderr=StringIO())
+            with open(path) as exported:
+                lines = exported.read().splitlines()
+
+        self.assertEqual(lines[0],
+                         'id,title,price,time_minutes,link,tags,ingredients')
+        self.assertTrue(lines[1].endswith(',Dal,2.00,5,,Vegan,'))
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('export_recipes', 'nobody@yopmail.com')
+
+
+class ImportRecipesTestCase(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'ansuman@yopmail.com', 'ansuman123'
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def run_import(self, path, **options):
+        call_command('import_recipes', 'ansuman@yopmail.com', path,
+                     stdout=StringIO(), **options)
+
+    def test_import_ndjson(self):
+        """Test recipes are created with tags matched ignoring case"""
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        rows = [
+            {'title': 'Dal', 'price': '4.50', 'time_minutes': 30,
+             'tags': ['vegan', 'Curry'], 'ingredients': ['Salt']},
+            {'title': 'Soup', 'price': 2, 'time_minutes': 10,
+             'tags': ['CURRY']},
+        ]
+        path = self.write('recipes.ndjson',
+                          '\n'.join(json.dumps(row) for row in rows))
+
+        self.run_import(path, batch_size=1)
+
+        dal = Recipe.objects.get(user=self.user, title='Dal')
+        self.assertEqual(str(dal.price), '4.50')
+        self.assertEqual(sorted(t.name for t in dal.tags.all()),
+                         ['Curry', 'Vegan'])
+        self.assertIn(vegan, dal.tags.all())
+        soup = Recipe.objects.get(user=self.user, title='Soup')
+        self.assertEqual(list(soup.tags.all()), list(
+            Tag.objects.filter(name='Curry')
+        ))
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(list(Ingredient.objects.values_list('name')),
+                         [('Salt',)])
+
+    def test_export_import_round_trip(self):
+        """Test a CSV export imports into another user's library"""
+        other = get_user_model().objects.create_user(
+            'other@yopmail.com', 'password123'
+        )
+        recipe = Recipe.objects.create(user=other, title='Dal',
+                                       time_minutes=5, price=2)
+        recipe.tags.add(Tag.objects.create(user=other, name='Hot, spicy'))
+        path = os.path.join(self.directory.name, 'export.csv')
+        call_command('export_recipes', 'other@yopmail.com', format='csv',
+                     output=path, stderr=StringIO())
+
+        self.run_import(path)
+
+        imported = Recipe.objects.get(user=self.user)
+        self.assertEqual(imported.title, 'Dal')
+        self.assertEqual([t.name for t in imported.tags.all()],
+                         ['Hot, spicy'])
+        self.assertEqual(imported.tags.get().user, self.user)
+
+    def test_invalid_row_stops_and_resumes(self):
+        """Test committed batches are checkpointed and skipped on rerun"""
+        rows = [{'title': f'Recipe {n}', 'price': 1, 'time_minutes': 1}
+                for n in range(4)]
+        rows[2]['price'] = 'free'
+        path = self.write('recipes.ndjson',
+                          '\n'.join(json.dumps(row) for row in rows))
+        checkpoint = os.path.join(self.directory.name, 'checkpoint.json')
+
+        with self.assertRaisesRegex(CommandError, 'line 3'):
+            self.run_import(path, batch_size=2, checkpoint=checkpoint)
+        self.assertEqual(Recipe.objects.count(), 2)
+
+        rows[2]['price'] = 3
+        self.write('recipes.ndjson',
+                   '\n'.join(json.dumps(row) for row in rows))
+        self.run_import(path, batch_size=2, checkpoint=checkpoint)
+
+        self.assertEqual(
+            sorted(Recipe.objects.values_list('title', flat=True)),
+            [f'Recipe {n}' for n in range(4)]
+        )
+
+
+class BenchmarkApiTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        call_command('seed_data', users=2, recipes=5, tags=4, ingredients=6,
+                     stdout=StringIO())
+
+    def test_seed_data(self):
+        """Test seeding refuses to run twice unless asked to clear"""
+        self.assertEqual(seeded_users('load').count(), 2)
+        self.assertEqual(Recipe.objects.count(), 10)
+
+        with self.assertRaises(CommandError):
+            call_command('seed_data', users=1, stdout=StringIO())
+        call_command('seed_data', users=1, recipes=1, clear=True,
+                     stdout=StringIO())
+
+        self.assertEqual(seeded_users('load').count(), 1)
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_benchmark_writes_results(self):
+        """Test each scenario is reported and stored without errors"""
+        path = os.path.join(self.directory.name, 'results.json')
+        out = StringIO()
+
+        call_command('benchmark_api', requests=40, warmup=1, output=path,
+                     label='test', scenario=['token', 'me'], stdout=out)
+
+        with open(path) as file:
+            results = json.load(file)
+        self.assertEqual(results['label'], 'test')
+        self.assertEqual(results['target'], 'in-process')
+        self.assertEqual(len(out.getvalue().splitlines()),
+                         len(results['scenarios']))
+        for name, stats in results['scenarios'].items():
+            self.assertEqual(stats['runs'], 40, name)
+            self.assertEqual(stats['errors'], 0, name)
+
+    def test_benchmark_compare_fails_on_regression(self):
+        """Test a run slower than the baseline fails the command"""
+        path = os.path.join(self.directory.name, 'baseline.json')
+        with open(path, 'w') as file:
+            json.dump({'scenarios': {'me': {
+                'p50': 0.001, 'p95': 0.001, 'p99': 0.001, 'rps': 1e6
+            }}}, file)
+
+        with self.assertRaisesRegex(CommandError, 'me'):
+            call_command('benchmark_api', scenario=['me'], requests=2,
+                         warmup=0, compare=path, stdout=StringIO())
+
+    def test_benchmark_needs_seeded_users(self):
+        """Test a clear error when seed_data has not been run"""
+        with self.assertRaisesRegex(CommandError, 'seed_data'):
+            call_command('benchmark_api', prefix='missing',
+                         stdout=StringIO())
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=100, PASSWORD_HASHERS=[
+        'user.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    ])
+    def test_benchmark_hashers(self):
+        """Test each hasher reports its verify throughput per thread count"""
+        out = StringIO()
+
+        call_command('benchmark_hashers', repeat=2, threads=[1, 2],
+                     stdout=out)
 
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command("wait_for_db")
-            self.assertEqual(gi.call_count, 6)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([(r['hasher'], r['threads']) for r in rows], [
+            ('pbkdf2_sha256', 1), ('pbkdf2_sha256', 2),
+            ('pbkdf2_sha1', 1), ('pbkdf2_sha1', 2),
+        ])
+        self.assertTrue(all(r['verifies_per_second'] > 0 for r in rows))
@@ -0,0 +1,155 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.db import connection, connections
+from django.test import SimpleTestCase
+from psycopg2 import extensions
+
+from core.db.backends.postgresql_pool import base
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """Stand-in for a DB-API connection"""
+
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.opened = []
+
+    def connect(self):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+    def make_pool(self, **kwargs):
+        return ConnectionPool(self.connect, clock=self.clock, **kwargs)
+
+    def test_released_connection_reused(self):
+        """Test a returned connection is handed out again"""
+        pool = self.make_pool()
+        first = pool.acquire()
+        pool.release(first)
+
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_max_lifetime_replaces_connection(self):
+        """Test connections older than max_lifetime are closed"""
+        pool = self.make_pool(max_lifetime=60)
+        first = pool.acquire()
+        pool.release(first)
+        self.clock.now += 61
+
+        second = pool.acquire()
+
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_idle_timeout_replaces_connection(self):
+        """Test connections idle for too long are closed"""
+        pool = self.make_pool(idle_timeout=10)
+        first = pool.acquire()
+        pool.release(first)
+        self.clock.now += 11
+
+        self.assertIsNot(pool.acquire(), first)
+        self.assertTrue(first.closed)
+
+    def test_failed_health_check_discards(self):
+        """Test idle connections failing the check are not handed out"""
+        pool = self.make_pool(check_interval=5,
+                              check=lambda conn: not conn.closed)
+        first = pool.acquire()
+        pool.release(first)
+        first.closed = 1
+        self.clock.now += 6
+
+        second = pool.acquire()
+
+        self.assertIsNot(second, first)
+        self.assertEqual(pool.stats(), {'size': 1, 'idle': 0, 'in_use': 1})
+
+    def test_failed_reset_discards(self):
+        """Test a connection that can't be reset is closed on release"""
+        def reset(conn):
+            raise RuntimeError('connection lost')
+
+        pool = self.make_pool(reset=reset)
+        first = pool.acquire()
+        pool.release(first)
+
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_exhausted_pool_times_out(self):
+        """Test acquire gives up when every connection stays in use"""
+        pool = ConnectionPool(self.connect, max_size=1, timeout=0.01)
+        pool.acquire()
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+    def test_waiting_thread_gets_released_connection(self):
+        """Test a blocked acquire is woken by a release"""
+        pool = ConnectionPool(self.connect, max_size=1, timeout=5)
+        first = pool.acquire()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(pool.acquire()))
+        waiter.start()
+        pool.release(first)
+        waiter.join(5)
+
+        self.assertEqual(result, [first])
+        self.assertEqual(len(self.opened), 1)
+
+
+class PooledBackendTests(SimpleTestCase):
+
+    def make_connection(self, **conn_params):
+        conn = MagicMock()
+        conn.closed = 0
+        conn.get_transaction_status.return_value = \
+            extensions.TRANSACTION_STATUS_IDLE
+        return conn
+
+    def test_connection_reused_across_requests(self):
+        """Test closing at the end of a request returns the connection to
+        the pool and the next request reuses it"""
+        settings_dict = dict(connection.settings_dict,
+                             NAME='pool_test', CONN_MAX_AGE=0,
+                             POOL={'SIZE': 2})
+        wrapper = base.DatabaseWrapper(settings_dict, alias='pool_test')
+
+        # connection_created receivers (django.contrib.postgres) look the
+        # alias up in connections
+        with patch.dict(connections.databases, {'pool_test': settings_dict}), \
+                patch.object(connections._connections, 'pool_test', wrapper,
+                             create=True), \
+                patch.object(base.base.Database, 'connect',
+                             side_effect=self.make_connection) as connect:
+            for _ in range(3):
+                wrapper.ensure_connection()
+                wrapper.close_if_unusable_or_obsolete()
+
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(wrapper.pool.stats()['idle'], 1)
+        base.close_pools()
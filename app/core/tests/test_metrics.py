@@ -0,0 +1,98 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.metrics import Histogram, Registry, RequestMetrics, registry
+from core.models import Recipe
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", serializer;dur=([\d.]+), '
+    r'total;dur=[\d.]+'
+)
+
+
+class HistogramTests(SimpleTestCase):
+
+    def test_buckets_are_cumulative_and_inclusive(self):
+        """Test a value on a bound falls in that bucket and counts add up"""
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 7):
+            histogram.observe(value)
+
+        self.assertEqual(list(histogram.samples()),
+                         [(1, 2), (5, 3), ('+Inf', 4)])
+        self.assertEqual(histogram.sum, 11)
+        self.assertEqual(histogram.count, 4)
+
+    def test_render_exposition_format(self):
+        """Test each view gets labelled bucket, sum and count samples"""
+        metrics = Registry()
+        sample = RequestMetrics()
+        sample.queries = 3
+        metrics.observe('recipe:recipe-list', sample)
+
+        text = metrics.render()
+
+        self.assertIn('# TYPE http_request_db_queries histogram', text)
+        self.assertIn('http_request_db_queries_bucket'
+                      '{view="recipe:recipe-list",le="2"} 0', text)
+        self.assertIn('http_request_db_queries_bucket'
+                      '{view="recipe:recipe-list",le="3"} 1', text)
+        self.assertIn('http_request_db_queries_count'
+                      '{view="recipe:recipe-list"} 1', text)
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsMiddlewareTests(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.user = get_user_model().objects.create_user(
+            'metrics@example.com', 'testpass123'
+        )
+        Recipe.objects.create(user=self.user, title='Dal',
+                              time_minutes=10, price=5)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        """Test responses report their query count and timings"""
+        res = self.client.get(reverse('recipe:recipe-list'))
+
+        match = SERVER_TIMING.fullmatch(res['Server-Timing'])
+        self.assertIsNotNone(match, res['Server-Timing'])
+        self.assertGreater(int(match.group(1)), 0)
+        serializer = re.search(
+            r'http_request_serializer_duration_seconds_sum'
+            r'\{view="recipe:recipe-list"\} (\S+)', registry.render()
+        )
+        self.assertGreater(float(serializer.group(1)), 0)
+
+    def test_metrics_endpoint_aggregates_per_view(self):
+        """Test /metrics exposes histograms labelled by view name"""
+        self.client.get(reverse('recipe:recipe-list'))
+        self.client.get(reverse('recipe:recipe-list'))
+        self.client.get(reverse('recipe:tag-list'))
+
+        res = self.client.get(reverse('metrics'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        text = res.content.decode()
+        self.assertIn('http_request_duration_seconds_count'
+                      '{view="recipe:recipe-list"} 2', text)
+        self.assertIn('http_request_duration_seconds_count'
+                      '{view="recipe:tag-list"} 1', text)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        """Test nothing is recorded or exposed when disabled"""
+        res = self.client.get(reverse('recipe:recipe-list'))
+
+        self.assertNotIn('Server-Timing', res)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code,
+                         404)
+        self.assertEqual(registry.render().count('_count'), 0)
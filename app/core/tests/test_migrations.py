@@ -0,0 +1,62 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrationTestCase(TransactionTestCase):
+    """ Migrate back to migrate_from, let the test seed rows with the
+    historical models, then migrate forward to migrate_to """
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.leaf = executor.loader.graph.leaf_nodes('core')
+        executor.migrate([('core', self.migrate_from)])
+        self.old_apps = executor.loader.project_state(
+            [('core', self.migrate_from)]
+        ).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.leaf)
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('core', self.migrate_to)])
+        return executor.loader.project_state(
+            [('core', self.migrate_to)]
+        ).apps
+
+
+class MergeDuplicateNamesTests(MigrationTestCase):
+    migrate_from = '0005_auto_20200726_0647'
+    migrate_to = '0006_indexes'
+
+    def test_case_duplicates_merged_before_unique_index(self):
+        """Test tags differing by case fold into one, keeping links"""
+        User = self.old_apps.get_model('core', 'User')
+        Tag = self.old_apps.get_model('core', 'Tag')
+        Recipe = self.old_apps.get_model('core', 'Recipe')
+        user = User.objects.create(email='dupes@yopmail.com')
+        vegan, lower, upper = [Tag.objects.create(user=user, name=name)
+                               for name in ('Vegan', 'vegan', 'VEGAN')]
+        first = Recipe.objects.create(user=user, title='Dal', price=1,
+                                      time_minutes=5, link='')
+        second = Recipe.objects.create(user=user, title='Curry', price=1,
+                                       time_minutes=5, link='')
+        first.tags.add(vegan, lower)
+        second.tags.add(upper)
+
+        apps = self.migrate()
+
+        Tag = apps.get_model('core', 'Tag')
+        Recipe = apps.get_model('core', 'Recipe')
+        self.assertEqual(list(Tag.objects.values_list('name', flat=True)),
+                         ['Vegan'])
+        for recipe in Recipe.objects.all():
+            self.assertEqual(
+                list(recipe.tags.values_list('name', flat=True)), ['Vegan']
+            )
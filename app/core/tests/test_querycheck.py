@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Tag
+from core.querycheck import DuplicateQueriesError, QueryCheckMixin, \
+    fingerprint, track_queries
+
+TAGS_URL = reverse('recipe:tag-list')
+
+
+class FingerprintTests(SimpleTestCase):
+
+    def test_values_are_folded(self):
+        """Test queries differing only in their values compare equal"""
+        self.assertEqual(
+            fingerprint('SELECT "a" FROM "t" WHERE "id" = %s\n  AND '
+                        '"name" = \'it\'\'s\' LIMIT 21'),
+            'SELECT "a" FROM "t" WHERE "id" = ? AND "name" = ? LIMIT ?'
+        )
+
+    def test_in_lists_of_any_length_are_folded(self):
+        """Test IN lists fingerprint the same whatever their length"""
+        self.assertEqual(
+            fingerprint('SELECT 1 FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT 1 FROM "t" WHERE "id" IN (%s)')
+        )
+
+    def test_identifiers_are_kept(self):
+        """Test digits inside identifiers are not values"""
+        self.assertEqual(fingerprint('SELECT U0."id" FROM "t" U0'),
+                         'SELECT U0."id" FROM "t" U0')
+
+
+class QueryCheckTests(QueryCheckMixin, TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'querycheck@example.com', 'testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_tracker_reports_origin_of_repeated_queries(self):
+        """Test repeated fingerprints are reported with their caller"""
+        with track_queries() as tracker:
+            for pk in range(3):
+                Tag.objects.filter(pk=pk).first()
+
+        [duplicate] = tracker.duplicates(1)
+        self.assertEqual(duplicate.count, 3)
+        self.assertRegex(duplicate.origin,
+                         r'^core/tests/test_querycheck\.py:\d+ in test_')
+
+    def test_mixin_fails_on_repeated_queries(self):
+        """Test assertNoDuplicateQueries fails an N+1 loop"""
+        with self.assertRaisesRegex(AssertionError, r'3x from core/tests'):
+            with self.assertNoDuplicateQueries():
+                for pk in range(3):
+                    Tag.objects.filter(pk=pk).exists()
+
+    @override_settings(QUERY_CHECK={'ENABLED': True, 'THRESHOLD': 0})
+    def test_middleware_logs_repeated_queries(self):
+        """Test the middleware logs offending requests by view name"""
+        with self.assertLogs('core.querycheck', 'WARNING') as logs:
+            res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('recipe:tag-list repeated queries', logs.output[0])
+
+    @override_settings(QUERY_CHECK={'ENABLED': True, 'THRESHOLD': 0,
+                                    'RAISE': True})
+    def test_middleware_raises(self):
+        """Test RAISE turns repeated queries into an error"""
+        with self.assertRaises(DuplicateQueriesError):
+            self.client.get(TAGS_URL)
+
+    @override_settings(QUERY_CHECK={'ENABLED': True})
+    def test_middleware_passes_clean_requests(self):
+        """Test requests below the threshold are left alone"""
+        with patch('core.querycheck.logger') as logger:
+            res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        logger.warning.assert_not_called()
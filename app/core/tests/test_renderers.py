@@ -0,0 +1,69 @@
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_matches_stdlib_renderer(self):
+        """Test output has the same content as DRF's JSONRenderer"""
+        data = {'id': 1, 'title': 'Dal\u2028makhani', 'tags': [1, 2],
+                'created': datetime(2020, 7, 26, tzinfo=timezone.utc),
+                1: None}
+
+        fast = FastJSONRenderer().render(data)
+
+        self.assertEqual(json.loads(fast), json.loads(
+            JSONRenderer().render(data)
+        ))
+        self.assertIn(b'"2020-07-26T00:00:00Z"', fast)
+        self.assertIn(b'\\u2028', fast)
+
+    def test_decimal_rendered_exactly(self):
+        """Test Decimal prices keep every digit on every path"""
+        data = {'price': Decimal('12345.10')}
+        renderer = FastJSONRenderer()
+
+        rendered = [
+            renderer.render(data),
+            renderer.render(data, 'application/json; indent=4'),
+        ]
+        with patch('core.renderers.orjson', None):
+            rendered.append(renderer.render(data))
+
+        for output in rendered:
+            self.assertEqual(json.loads(output), {'price': '12345.10'})
+
+    def test_fallbacks(self):
+        """Test indented output and a missing orjson use the stdlib"""
+        renderer = FastJSONRenderer()
+        self.assertIn(b'\n    "a"', renderer.render(
+            {'a': 1}, 'application/json; indent=4'
+        ))
+        with patch('core.renderers.orjson', None):
+            self.assertEqual(renderer.render({'a': Decimal('1.50')}),
+                             b'{"a":"1.50"}')
+
+
+class FastJSONParserTests(SimpleTestCase):
+
+    def test_parse(self):
+        """Test JSON bodies parse and invalid ones raise ParseError"""
+        parser = FastJSONParser()
+
+        self.assertEqual(parser.parse(io.BytesIO(b'{"price": 5.10}')),
+                         {'price': 5.1})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"price": NaN}'))
+        with patch('core.parsers.orjson', None):
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(b'{'))
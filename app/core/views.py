@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+
+from core import metrics as request_metrics
+from core.health import check_database, check_cache, check_migrations, \
+    run_checks
+
+
+@require_GET
+def healthz(request):
+    """ Liveness: the process serves requests, dependencies not checked """
+    return JsonResponse({'status': 'ok'})
+
+
+@require_GET
+def readyz(request):
+    """ Readiness: database, cache and migrations are all usable """
+    ok, results = run_checks((
+        ('database', check_database),
+        ('cache', check_cache),
+        ('migrations', check_migrations),
+    ))
+    return JsonResponse(
+        {'status': 'ok' if ok else 'unavailable', 'checks': results},
+        status=200 if ok else 503
+    )
+
+
+@require_GET
+def metrics(request):
+    """ Per-view request histograms of this process for Prometheus """
+    if not getattr(settings, 'METRICS_ENABLED', False):
+        raise Http404
+    return HttpResponse(
+        request_metrics.registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
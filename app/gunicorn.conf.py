@@ -0,0 +1,70 @@
+"""
+Gunicorn settings, loaded when gunicorn runs from this directory:
+
+    gunicorn app.wsgi:application
+
+Sizing comes from the environment, defaults from the CPU count:
+
+    WEB_CONCURRENCY         worker processes, 2 * CPUs + 1
+    GUNICORN_THREADS        threads per worker, more than 1 switches to
+                            the gthread worker. Each busy thread holds a
+                            database connection, see DB_POOL_SIZE
+    GUNICORN_MAX_REQUESTS   requests before a worker is recycled, 0 never
+    GUNICORN_PRELOAD        0 to import the app in each worker instead of
+                            once in the master
+
+With the app preloaded, workers share the imported code and settings
+copy-on-write. SIGHUP then restarts workers gracefully but without new
+code; deploy code by starting a new master with SIGUSR2 and stopping the
+old one with SIGWINCH and SIGTERM, or by restarting the container.
+"""
+
+import gc
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings_production')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+workers = int(os.environ.get('WEB_CONCURRENCY',
+                             multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Recycling bounds slow leaks; the jitter keeps workers from restarting
+# all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER',
+                                         max_requests // 10))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Heartbeat files on tmpfs, a disk backed /tmp can stall workers in
+# containers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def when_ready(server):
+    # Objects of the preloaded app are never collected, keep the cycle
+    # collector from touching, and so copying, their pages in workers
+    if server.cfg.preload_app:
+        gc.freeze()
+
+
+def pre_fork(server, worker):
+    # Workers must not inherit sockets the master opened while preloading
+    if server.cfg.preload_app:
+        from django.db import connections
+        from core.db.backends.postgresql_pool.base import close_pools
+
+        connections.close_all()
+        close_pools()
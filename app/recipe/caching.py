@@ -0,0 +1,74 @@
+import hashlib
+import pickle
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from core.cache import SingleFlight, build_cache
+from recipe.conditional import ConditionalGetMixin
+
+single_flight = SingleFlight()
+_response_cache = None
+_lock = threading.Lock()
+
+
+def get_response_cache():
+    """ build_cache(settings.RESPONSE_CACHE), built on first use rather
+    than at import so overridden settings apply """
+    global _response_cache
+    if _response_cache is None:
+        with _lock:
+            if _response_cache is None:
+                _response_cache = build_cache(
+                    getattr(settings, 'RESPONSE_CACHE', {})
+                )
+    return _response_cache
+
+
+@receiver(setting_changed)
+def reset_response_cache(setting, **kwargs):
+    global _response_cache
+    if setting == 'RESPONSE_CACHE':
+        _response_cache = None
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """ Serve repeated reads from a cache of serialized response data.
+    Keys include the user's CollectionVersion, which the core signals
+    bump on every change, so a write makes all older entries of that user
+    unreachable while other users' entries stay valid """
+
+    def get_cache_key(self, request, *args, **kwargs):
+        params = sorted(request.query_params.lists())
+        # Pagination links in the data are absolute, built from these
+        origin = (request.scheme, request.get_host())
+        digest = hashlib.sha1(repr((origin, params, sorted(kwargs.items())))
+                              .encode()).hexdigest()
+        return ':'.join((
+            'response', str(request.user.pk), str(self.collection_version),
+            type(self).__name__, self.action,
+            request.accepted_renderer.format, digest,
+        ))
+
+    def get_response(self, handler, request, *args, **kwargs):
+        if not getattr(settings, 'RESPONSE_CACHE', {}).get('ENABLED', True):
+            return handler(request, *args, **kwargs)
+        response_cache = get_response_cache()
+        key = self.get_cache_key(request, *args, **kwargs)
+        data = response_cache.get(key)
+        if data is not None:
+            return Response(pickle.loads(data))
+
+        def render():
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                response_cache.set(key, pickle.dumps(response.data))
+            return response
+
+        # Concurrent misses for the same key wait for one database query
+        # and reuse its data instead of all hitting the database at once
+        response = single_flight.do(key, render)
+        return Response(response.data, status=response.status_code)
@@ -0,0 +1,43 @@
+from django.utils.cache import get_conditional_response, \
+    patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from core.models import CollectionVersion
+
+
+class ConditionalGetMixin:
+    """ Answer If-None-Match / If-Modified-Since on list with 304 after
+    looking up the user's CollectionVersion, before any query or
+    serialization the action itself would run. Wrap other read actions
+    with conditional() """
+
+    def get_validators(self, request):
+        """ Return (etag, last modified timestamp) of the user's data """
+        row = CollectionVersion.objects.filter(user=request.user)\
+            .values_list('version', 'updated_at').first()
+        version, updated_at = row or (0, None)
+        self.collection_version = version
+        etag = f'"{version}.{request.accepted_renderer.format}"'
+        return etag, updated_at and int(updated_at.timestamp())
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.get_response(handler, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def get_response(self, handler, request, *args, **kwargs):
+        """ Produce the full response when the client's copy is stale """
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
@@ -0,0 +1,80 @@
+from urllib.parse import urlencode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import reverse
+from rest_framework import serializers
+
+from core.images import upload_id
+
+
+def resolve_pks(queryset, pks):
+    """ Fetch the objects for pks with a single query. Returns a dict of
+    pk -> object and the list of pks that were not found, in input order """
+    found = queryset.in_bulk(set(pks)) if pks else {}
+    missing = list(dict.fromkeys(pk for pk in pks if pk not in found))
+    return found, missing
+
+
+def scope_to_user(queryset, context):
+    """ Restrict queryset to objects owned by the requesting user """
+    request = context.get('request')
+    if request is None or not request.user.is_authenticated:
+        return queryset.none()
+    return queryset.filter(user=request.user)
+
+
+class BatchedPrimaryKeyRelatedField(serializers.ManyRelatedField):
+    """ Many related pk field that validates every submitted pk with one
+    query limited to the requesting user's objects, and reports all
+    missing pks at once """
+
+    def __init__(self, queryset, **kwargs):
+        child = serializers.PrimaryKeyRelatedField(queryset=queryset)
+        super().__init__(child_relation=child, **kwargs)
+
+    def get_queryset(self):
+        return scope_to_user(self.child_relation.get_queryset(), self.context)
+
+    def to_pk(self, item):
+        try:
+            return self.get_queryset().model._meta.pk.to_python(item)
+        except (DjangoValidationError, TypeError, ValueError):
+            self.child_relation.fail(
+                'incorrect_type', data_type=type(item).__name__
+            )
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        pks = [self.to_pk(item) for item in data]
+        found, missing = resolve_pks(self.get_queryset(), pks)
+        if missing:
+            message = self.child_relation.error_messages['does_not_exist']
+            raise serializers.ValidationError(
+                [message.format(pk_value=pk) for pk in missing],
+                code='does_not_exist'
+            )
+        return [found[pk] for pk in dict.fromkeys(pks)]
+
+
+class ImageURLsField(serializers.Field):
+    """ URLs of a recipe's image and of its generated variants, null
+    without an image. The v parameter changes with every upload, so
+    responses to these URLs can be cached for good """
+
+    def __init__(self, **kwargs):
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        if not recipe.image:
+            return None
+        url = reverse('recipe:recipe-image', args=[recipe.pk])
+        upload = upload_id(recipe.image.name)
+        return {
+            variant: f'{url}?{urlencode({"variant": variant, "v": upload})}'
+            for variant in ['original', *recipe.image_variants]
+        }
@@ -0,0 +1,168 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, \
+    TrigramSimilarity
+from django.db import connections
+from django.db.models import Count, DecimalField, Exists, F, OuterRef, Q
+from django.db.models.functions import Cast
+from rest_framework import serializers
+
+from core.models import Recipe
+
+
+class CommaSeparatedIntegerField(serializers.CharField):
+    """ '1,2,3' -> [1, 2, 3], without duplicates """
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            ids = [int(part) for part in value.split(',') if part.strip()]
+        except ValueError:
+            raise serializers.ValidationError(
+                'Expected a comma separated list of ids.'
+            )
+        return list(dict.fromkeys(ids))
+
+
+class RecipeFilterSerializer(serializers.Serializer):
+    """ Query parameters accepted by the recipe list """
+    tags = CommaSeparatedIntegerField(required=False)
+    ingredients = CommaSeparatedIntegerField(required=False)
+    match = serializers.ChoiceField(choices=('any', 'all'), default='any')
+    time_minutes_min = serializers.IntegerField(required=False)
+    time_minutes_max = serializers.IntegerField(required=False)
+    price_min = serializers.DecimalField(max_digits=7, decimal_places=2,
+                                         required=False)
+    price_max = serializers.DecimalField(max_digits=7, decimal_places=2,
+                                         required=False)
+    search = serializers.CharField(max_length=200, required=False,
+                                   allow_blank=True)
+
+
+class AttributeFilterSerializer(serializers.Serializer):
+    """ Query parameters accepted by the tag and ingredient lists """
+    assigned_only = serializers.BooleanField(default=False)
+    recipe_count = serializers.BooleanField(default=False)
+
+
+RANGE_LOOKUPS = (
+    ('time_minutes_min', 'time_minutes__gte'),
+    ('time_minutes_max', 'time_minutes__lte'),
+    ('price_min', 'price__gte'),
+    ('price_max', 'price__lte'),
+)
+
+
+class QueryFiltersMixin:
+    """ Viewset mixin validating the query string once per request with
+    filter_serializer_class """
+    filter_serializer_class = None
+
+    def get_filters(self):
+        """ Validated filters from the query string, 400 if malformed """
+        if not hasattr(self, '_filters'):
+            filters = self.filter_serializer_class(
+                data=self.request.query_params
+            )
+            filters.is_valid(raise_exception=True)
+            self._filters = filters.validated_data
+        return self._filters
+
+
+def related_filter(field, ids, match):
+    """ Condition on a recipe M2M field expressed as a subquery over the
+    through table, so matching recipes are never duplicated by a join.
+    'any' is an EXISTS semi-join, 'all' keeps recipes linked to every id """
+    m2m = Recipe._meta.get_field(field)
+    column = f'{m2m.m2m_reverse_field_name()}_id'
+    links = m2m.remote_field.through.objects.filter(**{f'{column}__in': ids})
+    if match == 'any':
+        return Exists(links.filter(recipe_id=OuterRef('pk')))
+    return Q(pk__in=links.values('recipe_id')
+             .annotate(matched=Count(column))
+             .filter(matched=len(ids))
+             .values('recipe_id'))
+
+
+def filter_recipes(queryset, filters):
+    """ Apply validated RecipeFilterSerializer data to a Recipe queryset """
+    for field in ('tags', 'ingredients'):
+        if filters.get(field):
+            queryset = queryset.filter(
+                related_filter(field, filters[field], filters['match'])
+            )
+
+    for param, lookup in RANGE_LOOKUPS:
+        if filters.get(param) is not None:
+            queryset = queryset.filter(**{lookup: filters[param]})
+
+    if filters.get('search'):
+        queryset = search_recipes(queryset, filters['search'],
+                                  similar=filters.get('similar', False))
+    return queryset
+
+
+# Ranks are rounded to a fixed precision numeric, so the cursor position
+# taken from one page compares exactly against the next page's ranks
+RANK_FIELD = DecimalField(max_digits=12, decimal_places=9)
+_trigram_enabled = {}
+
+
+def trigram_enabled(using):
+    """ Whether pg_trgm is installed in the database, checked once """
+    if using not in _trigram_enabled:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+            )
+            _trigram_enabled[using] = cursor.fetchone() is not None
+    return _trigram_enabled[using]
+
+
+def search_recipes(queryset, text, similar=False):
+    """ Recipes matching text through the search_vector GIN index,
+    annotated with their rank. similar instead finds titles similar to
+    text with pg_trgm, for retrying searches that matched nothing, e.g.
+    because of a typo """
+    if similar:
+        return queryset.filter(title__trigram_similar=text).annotate(
+            rank=Cast(TrigramSimilarity('title', text), RANK_FIELD)
+        )
+    query = SearchQuery(text, config=getattr(settings, 'SEARCH_CONFIG',
+                                             'english'))
+    return queryset.filter(search_vector=query).annotate(
+        rank=Cast(SearchRank(F('search_vector'), query), RANK_FIELD)
+    )
+
+
+def filter_attributes(queryset, filters):
+    """ Apply validated AttributeFilterSerializer data to a tag or
+    ingredient queryset. assigned_only is an EXISTS semi-join """
+    if filters['assigned_only']:
+        m2m = queryset.model.recipe_set.field
+        column = f'{m2m.m2m_reverse_field_name()}_id'
+        queryset = queryset.filter(Exists(
+            m2m.remote_field.through.objects.filter(
+                **{column: OuterRef('pk')}
+            )
+        ))
+    return queryset
+
+
+def add_recipe_counts(instances):
+    """ Set recipe_count on a page of tags or ingredients with a single
+    grouped query over the through table. Counting the page instead of
+    annotating the list keeps the cost independent of how many tags a
+    user owns, as the (tag_id, recipe_id) index answers it directly """
+    if not instances:
+        return
+    m2m = type(instances[0]).recipe_set.field
+    column = f'{m2m.m2m_reverse_field_name()}_id'
+    counts = dict(
+        m2m.remote_field.through.objects
+        .filter(**{f'{column}__in': [obj.pk for obj in instances]})
+        .values_list(column)
+        .annotate(total=Count('recipe_id'))
+        .order_by()
+    )
+    for obj in instances:
+        obj.recipe_count = counts.get(obj.pk, 0)
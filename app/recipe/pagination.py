@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core import signing
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+from rest_framework.utils.urls import replace_query_param
+
+
+class SignedCursorPagination(CursorPagination):
+    """ Keyset pagination whose cursor is signed, so clients can't
+    forge positions or offsets """
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 100)
+    cursor_salt = 'recipe.pagination.cursor'
+
+    def encode_cursor(self, cursor):
+        tokens = {}
+        if cursor.offset != 0:
+            tokens['o'] = cursor.offset
+        if cursor.reverse:
+            tokens['r'] = 1
+        if cursor.position is not None:
+            tokens['p'] = cursor.position
+
+        encoded = signing.dumps(tokens, salt=self.cursor_salt)
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            tokens = signing.loads(encoded, salt=self.cursor_salt)
+            offset = min(int(tokens.get('o', 0)), self.offset_cutoff)
+            if offset < 0:
+                raise ValueError
+            reverse = bool(tokens.get('r', 0))
+            position = tokens.get('p')
+        except (signing.BadSignature, AttributeError, TypeError,
+                ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=offset, reverse=reverse, position=position)
+
+
+class RecipePagination(SignedCursorPagination):
+    ordering = '-id'
+
+
+class SearchPagination(SignedCursorPagination):
+    """ Best matches first, see recipe.filters.search_recipes. Equal
+    ranks are told apart by the cursor offset """
+    ordering = ('-rank', '-id')
+
+
+class NamePagination(SignedCursorPagination):
+    """ Names are unique per user so the name alone positions the cursor,
+    the id only keeps the order total """
+    ordering = ('-name', '-id')
@@ -1,8 +1,36 @@
+from django.conf import settings
+from django.db.models.functions import Lower
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from core.metrics import TimedSerializerMixin
 from core.models import Tag, Ingredient, Recipe
+from core import images
+from recipe.fields import BatchedPrimaryKeyRelatedField, ImageURLsField, \
+    resolve_pks, scope_to_user
 
 
-class TagSerializer(serializers.ModelSerializer):
+class UniqueNameSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
+    """ Names are unique per user regardless of case """
+
+    def validate_name(self, value):
+        request = self.context.get('request')
+        if request is None:
+            return value
+        queryset = self.Meta.model.objects.annotate(
+            lower_name=Lower('name')
+        ).filter(user=request.user, lower_name=value.lower())
+        if self.instance is not None:
+            queryset = queryset.exclude(pk=self.instance.pk)
+        if queryset.exists():
+            raise serializers.ValidationError(self.name_taken(value))
+        return value
+
+    def name_taken(self, value):
+        return f'{self.Meta.model.__name__} "{value}" already exists.'
+
+
+class TagSerializer(UniqueNameSerializer):
     """ Serializer for tag objects """
 
     class Meta:
@@ -11,7 +39,7 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', )
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(UniqueNameSerializer):
     """ Serializer for Ingredient """
 
     class Meta:
@@ -20,13 +48,28 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class RecipeSerializer(serializers.ModelSerializer):
-    ingredients = serializers.PrimaryKeyRelatedField(
-        many=True,
+class TagCountSerializer(TagSerializer):
+    """ Tag with the number of recipes using it, see add_recipe_counts """
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ('recipe_count',)
+
+
+class IngredientCountSerializer(IngredientSerializer):
+    """ Ingredient with the number of recipes using it,
+    see add_recipe_counts """
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ('recipe_count',)
+
+
+class RecipeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    ingredients = BatchedPrimaryKeyRelatedField(
         queryset=Ingredient.objects.all()
     )
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True,
+    tags = BatchedPrimaryKeyRelatedField(
         queryset=Tag.objects.all()
     )
 
@@ -41,3 +84,113 @@ class RecipeDetailSerializer(RecipeSerializer):
     """ Serialize a recipe detail """
     ingredients = IngredientSerializer(many=True, read_only=True)
     tags = TagSerializer(many=True, read_only=True)
+    images = ImageURLsField()
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ('images',)
+
+
+class RecipeImageSerializer(serializers.ModelSerializer):
+    """ Upload an image to a recipe, replacing any previous one """
+    image = serializers.FileField(write_only=True)
+    images = ImageURLsField()
+
+    class Meta:
+        model = Recipe
+        fields = ('id', 'image', 'images')
+        read_only_fields = ('id',)
+
+    def validate_image(self, value):
+        config = settings.RECIPE_IMAGES
+        if value.size > config['MAX_UPLOAD_SIZE']:
+            raise serializers.ValidationError(
+                f'Ensure the image is at most {config["MAX_UPLOAD_SIZE"]} '
+                f'bytes.'
+            )
+        try:
+            image_format, (width, height) = images.inspect(value)
+        except ValueError:
+            raise serializers.ValidationError(
+                'Upload a valid JPEG, PNG or WebP image.'
+            )
+        if image_format not in images.FORMATS:
+            raise serializers.ValidationError(
+                'Upload a valid JPEG, PNG or WebP image.'
+            )
+        if width * height > config['MAX_PIXELS']:
+            raise serializers.ValidationError(
+                f'Ensure the image has at most {config["MAX_PIXELS"]} '
+                f'pixels.'
+            )
+        # Stored under a name of the detected format, not the client's
+        value.name = f'original.{images.FORMATS[image_format][0]}'
+        return value
+
+    def update(self, instance, validated_data):
+        replaced = instance.image.name
+        instance.image = validated_data['image']
+        instance.image_variants = []
+        instance.save(update_fields=['image', 'image_variants',
+                                     'updated_at'])
+        images.image_changed(instance, replaced)
+        return instance
+
+
+class RecipeBulkListSerializer(serializers.ListSerializer):
+    """ Validate many recipes at once, resolving every referenced tag and
+    ingredient with one query per type, and insert them in bulk """
+    related_models = (('tags', Tag), ('ingredients', Ingredient))
+    does_not_exist = serializers.PrimaryKeyRelatedField\
+        .default_error_messages['does_not_exist']
+
+    def to_internal_value(self, data):
+        max_length = settings.BULK_MAX_RECIPES
+        if isinstance(data, list) and len(data) > max_length:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Ensure this list has no more than {max_length} '
+                    f'recipes.'
+                ]
+            })
+
+        attrs = super().to_internal_value(data)
+        errors = [{} for _ in attrs]
+        for field, model in self.related_models:
+            queryset = scope_to_user(model.objects.all(), self.context)
+            found, _ = resolve_pks(queryset, [
+                pk for item in attrs for pk in item.get(field, ())
+            ])
+            for item, item_errors in zip(attrs, errors):
+                pks = item.get(field, ())
+                missing = [pk for pk in dict.fromkeys(pks)
+                           if pk not in found]
+                if missing:
+                    item_errors[field] = [
+                        self.does_not_exist.format(pk_value=pk)
+                        for pk in missing
+                    ]
+                item[field] = [found[pk] for pk in pks if pk in found]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        return Recipe.objects.bulk_create_with_relations(validated_data)
+
+
+class RecipeBulkSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
+    """ A recipe in a bulk create request, relations are plain pks that
+    RecipeBulkListSerializer resolves for the whole list """
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+    tags = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+
+    class Meta:
+        model = Recipe
+        fields = RecipeSerializer.Meta.fields
+        read_only_fields = ('id',)
+        list_serializer_class = RecipeBulkListSerializer
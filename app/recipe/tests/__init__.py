@@ -1,3 +1,13 @@
 from .reciepe_tags_tests import *  # noqa
 from .recipe_model_test import *   # noqa
-from .reciepe_tests import * # noqa
\ No newline at end of file
+from .reciepe_tests import * # noqa
+from .recipe_query_tests import *  # noqa
+from .recipe_pagination_tests import *  # noqa
+from .recipe_bulk_tests import *  # noqa
+from .recipe_filter_tests import *  # noqa
+from .recipe_conditional_tests import *  # noqa
+from .recipe_caching_tests import *  # noqa
+from .recipe_values_tests import *  # noqa
+from .recipe_export_tests import *  # noqa
+from .recipe_search_tests import *  # noqa
+from .recipe_image_tests import *  # noqa
@@ -1,9 +1,11 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 from rest_framework.test import APIClient
 from django.urls import reverse
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from core.models import Tag, Ingredient
+from core.models import Tag, Ingredient, Recipe
 from recipe.serializers import TagSerializer
 
 TAGS_URL = reverse('recipe:tag-list')
@@ -42,7 +44,7 @@ class PrivateTagApiTests(TestCase):
 
         tags = Tag.objects.all().order_by('-name')
         serializer = TagSerializer(tags, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """ Test tags limited to user """
@@ -56,8 +58,8 @@ class PrivateTagApiTests(TestCase):
 
         res = self.client.get(TAGS_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag2.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag2.name)
 
     def test_create_tag_successful(self):
         """ Test create tag successful """
@@ -72,6 +74,77 @@ class PrivateTagApiTests(TestCase):
         res = self.client.post(TAGS_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_duplicate_tag_name_ignoring_case_fail(self):
+        """ Test a tag name can only exist once per user, in any case """
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        res = self.client.post(TAGS_URL, {'name': 'VEGAN'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_duplicate_tag_name_race_fail(self):
+        """ Test a name taken after the check is still a bad request """
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        with patch.object(TagSerializer, 'validate_name',
+                          lambda self, value: value):
+            res = self.client.post(TAGS_URL, {'name': 'vegan'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['name'], ['Tag "vegan" already exists.'])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_same_tag_name_for_other_user(self):
+        """ Test another user's tag does not block the name """
+        user2 = get_user_model().objects.create_user(
+            email='ansuman12@yopmail.com',
+            password='ansuman@123'
+        )
+        Tag.objects.create(user=user2, name='Vegan')
+
+        res = self.client.post(TAGS_URL, {'name': 'vegan'})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_assigned_only_tags(self):
+        """ Test assigned_only lists tags used by a recipe, once each """
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        Tag.objects.create(user=self.user, name='Unused')
+        for title in ('Dal', 'Salad'):
+            Recipe.objects.create(user=self.user, title=title,
+                                  time_minutes=5, price=5).tags.add(vegan)
+
+        res = self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'id': vegan.id, 'name': 'Vegan'}
+        ])
+
+    def test_tags_with_recipe_count(self):
+        """ Test recipe_count costs one grouped query per page """
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        unused = Tag.objects.create(user=self.user, name='Unused')
+        for title in ('Dal', 'Salad'):
+            Recipe.objects.create(user=self.user, title=title,
+                                  time_minutes=5, price=5).tags.add(vegan)
+
+        with self.assertNumQueries(3):
+            res = self.client.get(TAGS_URL, {'recipe_count': 1})
+
+        self.assertEqual(res.data['results'], [
+            {'id': vegan.id, 'name': 'Vegan', 'recipe_count': 2},
+            {'id': unused.id, 'name': 'Unused', 'recipe_count': 0},
+        ])
+        res = self.client.get(TAGS_URL, {'recipe_count': 1,
+                                         'assigned_only': 1})
+        self.assertEqual([t['name'] for t in res.data['results']], ['Vegan'])
+
+    def test_invalid_assigned_only_fail(self):
+        res = self.client.get(TAGS_URL, {'assigned_only': 'maybe'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class PublicIngredientTests(TestCase):
 
@@ -108,3 +181,19 @@ class PrivateIngredientTests(TestCase):
         payload = {'name': ''}
         res = self.client.post(INGREDIENT_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_assigned_only_ingredients_with_count(self):
+        """ Test ingredients can be limited to used ones with counts """
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        Ingredient.objects.create(user=self.user, name='Saffron')
+        recipe = Recipe.objects.create(user=self.user, title='Dal',
+                                       time_minutes=5, price=5)
+        recipe.ingredients.add(salt)
+
+        res = self.client.get(INGREDIENT_URL, {'assigned_only': 1,
+                                               'recipe_count': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'id': salt.id, 'name': 'Salt', 'recipe_count': 1}
+        ])
@@ -1,6 +1,8 @@
 from core.models import Recipe, Tag, Ingredient
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 from rest_framework import status
@@ -71,7 +73,7 @@ class PrivateRecipeApiTest(TestCase):
         recipe = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipe, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipe_limited_to_user(self):
         user2 = get_user_model().objects.create_user(
@@ -87,8 +89,8 @@ class PrivateRecipeApiTest(TestCase):
         recipe = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipe, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_view_recipe_detail(self):
         """ Test viewing a recipe detail """
@@ -178,3 +180,43 @@ class PrivateRecipeApiTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['title'], 'Sahi Panner')
 
+    def test_recipe_create_many_ingredients_single_query(self):
+        """ Test submitted ingredients are validated with one query """
+        ingredients = [sample_ingredient(user=self.user, name=f'Spice {n}')
+                       for n in range(40)]
+        payload = {
+            'title': 'Garam Masala',
+            'ingredients': [i.id for i in ingredients],
+            'tags': [],
+            'time_minutes': 30,
+            'price': '230.00'
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(RECIPE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        lookups = [q['sql'] for q in ctx.captured_queries
+                   if '"core_ingredient"."id" IN' in q['sql']]
+        self.assertEqual(len(lookups), 1)
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.ingredients.count(), 40)
+
+    def test_recipe_create_reports_all_invalid_tags(self):
+        """ Test other users' and unknown tags are all rejected at once """
+        user2 = get_user_model().objects.create_user(
+            email='another@ansuman.com',
+            password='ansuman123'
+        )
+        foreign = sample_tag(user=user2, name='Foreign')
+        own = sample_tag(user=self.user, name='Own')
+        payload = {
+            'title': 'Panner curry',
+            'tags': [own.id, foreign.id, 9999],
+            'time_minutes': 30,
+            'price': 230
+        }
+        res = self.client.post(RECIPE_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data['tags']), 2)
+        self.assertFalse(Recipe.objects.exists())
@@ -0,0 +1,94 @@
+from core.models import Recipe, Tag, Ingredient
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+BULK_URL = reverse('recipe:recipe-bulk')
+
+
+def recipe_payload(**kwargs):
+    default = {
+        'title': 'Mushroom Cream Soup',
+        'time_minutes': 5,
+        'price': '50.10'
+    }
+    default.update(kwargs)
+    return default
+
+
+class RecipeBulkApiTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='ansuman123',
+            name='Ansuman Singh'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_with_relations(self):
+        """ Test a list of recipes is created with tags and ingredients """
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        curry = Tag.objects.create(user=self.user, name='Curry')
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        payload = [
+            recipe_payload(title='Dal', tags=[vegan.id, curry.id],
+                           ingredients=[salt.id]),
+            recipe_payload(title='Soup', tags=[vegan.id]),
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([r['title'] for r in res.data], ['Dal', 'Soup'])
+        dal = Recipe.objects.get(user=self.user, title='Dal')
+        self.assertEqual(set(dal.tags.all()), {vegan, curry})
+        self.assertEqual(list(dal.ingredients.all()), [salt])
+        self.assertEqual(res.data[0]['tags'], sorted([vegan.id, curry.id]))
+
+    def test_bulk_create_query_count_is_constant(self):
+        """ Test the number of queries does not grow with the list """
+        tags = [Tag.objects.create(user=self.user, name=f'Tag {n}')
+                for n in range(5)]
+        small = [recipe_payload(tags=[t.id for t in tags])]
+        large = small * 20
+
+        with self.assertNumQueries(9):
+            self.client.post(BULK_URL, small, format='json')
+        with self.assertNumQueries(9):
+            res = self.client.post(BULK_URL, large, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 21)
+
+    def test_bulk_create_rejects_other_users_tags(self):
+        """ Test all invalid references are reported and nothing saved """
+        user2 = get_user_model().objects.create_user(
+            email='another@ansuman.com',
+            password='ansuman123'
+        )
+        foreign = Tag.objects.create(user=user2, name='Foreign')
+        payload = [
+            recipe_payload(),
+            recipe_payload(tags=[foreign.id, 9999], ingredients=[8888]),
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertEqual(len(res.data[1]['tags']), 2)
+        self.assertEqual(len(res.data[1]['ingredients']), 1)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_limit(self):
+        """ Test lists longer than BULK_MAX_RECIPES are rejected """
+        with self.settings(BULK_MAX_RECIPES=2):
+            res = self.client.post(BULK_URL, [recipe_payload()] * 3,
+                                   format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
@@ -0,0 +1,126 @@
+from unittest.mock import patch
+
+from core.cache import RedisCache
+from core.models import Recipe, Tag
+from core.tests.test_cache import FakeRedis
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from recipe.caching import get_response_cache
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='ansuman123',
+            name='Ansuman Singh'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user, title='Dal', time_minutes=10, price=5
+        )
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name='Hot'))
+
+    def assertCached(self, url, params=None):
+        """ Request twice, the second response only costs the version
+        lookup and carries the same data """
+        first = self.client.get(url, params)
+        with self.assertNumQueries(1):
+            second = self.client.get(url, params)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        return second
+
+    def test_list_and_detail_are_cached(self):
+        """ Test repeated reads skip the queryset and serializer """
+        self.assertCached(RECIPES_URL)
+        tag = self.recipe.tags.get()
+        self.assertCached(RECIPES_URL, {'tags': str(tag.pk)})
+        res = self.assertCached(detail_url(self.recipe.id))
+        self.assertEqual(res.data['tags'][0]['name'], 'Hot')
+
+    def test_writes_invalidate(self):
+        """ Test saving, relinking and renaming are visible immediately """
+        self.assertCached(detail_url(self.recipe.id))
+        tag = self.recipe.tags.get()
+        tag.name = 'Spicy'
+        tag.save()
+
+        res = self.client.get(detail_url(self.recipe.id))
+        self.assertEqual(res.data['tags'][0]['name'], 'Spicy')
+
+        self.recipe.tags.clear()
+        res = self.client.get(detail_url(self.recipe.id))
+        self.assertEqual(res.data['tags'], [])
+
+        self.client.patch(detail_url(self.recipe.id), {'title': 'Soup'})
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res.data['results'][0]['title'], 'Soup')
+
+    def test_cache_is_per_user(self):
+        """ Test users never see each other's cached responses """
+        self.assertCached(RECIPES_URL)
+        other = get_user_model().objects.create_user(
+            'other@yopmail.com', 'password123'
+        )
+        self.client.force_authenticate(other)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_errors_are_not_cached(self):
+        """ Test 404s are recomputed """
+        url = detail_url(self.recipe.id + 1000)
+        self.assertEqual(self.client.get(url).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_redis_backend(self):
+        """ Test the Redis backend through a local stand-in """
+        client = FakeRedis()
+        with patch('recipe.caching.get_response_cache',
+                   return_value=RedisCache(client, prefix='test:')):
+            self.assertCached(RECIPES_URL)
+
+        self.assertEqual(len(client.data), 1)
+        self.assertTrue(next(iter(client.data)).startswith(
+            f'test:response:{self.user.pk}:'
+        ))
+
+    @override_settings(ALLOWED_HOSTS=['api.example.com', 'internal'])
+    def test_cache_is_per_origin(self):
+        """ Test pagination links never point to another host or scheme """
+        params = {'page_size': 1}
+        Recipe.objects.create(user=self.user, title='Soup', time_minutes=5,
+                              price=3)
+        self.client.get(RECIPES_URL, params, HTTP_HOST='internal')
+
+        res = self.client.get(RECIPES_URL, params, secure=True,
+                              HTTP_HOST='api.example.com')
+
+        self.assertTrue(res.data['next'].startswith(
+            'https://api.example.com/'
+        ))
+
+    def test_settings_read_on_use(self):
+        """ Test overriding RESPONSE_CACHE takes effect """
+        self.client.get(RECIPES_URL)
+        with override_settings(RESPONSE_CACHE={'ENABLED': False}):
+            with self.assertNumQueries(2):
+                self.client.get(RECIPES_URL)
+        with override_settings(RESPONSE_CACHE={'TTL': 5}):
+            self.assertEqual(get_response_cache().ttl, 5)
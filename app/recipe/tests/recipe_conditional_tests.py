@@ -0,0 +1,102 @@
+from core.models import CollectionVersion, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='ansuman123',
+            name='Ansuman Singh'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user, title='Dal', time_minutes=10, price=5
+        )
+
+    def assertNotModified(self, url, **headers):
+        with self.assertNumQueries(1):
+            res = self.client.get(url, **headers)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+        return res
+
+    def test_matching_etag_is_not_modified(self):
+        """ Test a matching If-None-Match skips the list and detail """
+        for url in (RECIPES_URL, detail_url(self.recipe.id), TAGS_URL):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertIn('private', res['Cache-Control'])
+
+            not_modified = self.assertNotModified(
+                url, HTTP_IF_NONE_MATCH=res['ETag']
+            )
+            self.assertEqual(not_modified['ETag'], res['ETag'])
+
+    def test_if_modified_since(self):
+        """ Test If-Modified-Since is answered from the version row """
+        res = self.client.get(RECIPES_URL)
+
+        self.assertNotModified(
+            RECIPES_URL, HTTP_IF_MODIFIED_SINCE=res['Last-Modified']
+        )
+
+    def test_changes_invalidate_etag(self):
+        """ Test every kind of change produces a new ETag """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        changes = (
+            lambda: self.recipe.tags.add(tag),
+            lambda: tag.recipe_set.remove(self.recipe),
+            lambda: Tag.objects.filter(pk=tag.pk).get().save(),
+            lambda: Recipe.objects.bulk_create_with_relations(
+                [{'user': self.user, 'title': 'Soup', 'time_minutes': 1,
+                  'price': 1, 'tags': [tag]}]
+            ),
+            lambda: self.recipe.delete(),
+        )
+        etag = self.client.get(RECIPES_URL)['ETag']
+        for change in changes:
+            change()
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(res['ETag'], etag)
+            etag = res['ETag']
+
+    def test_relation_change_touches_recipe(self):
+        """ Test adding a tag updates the recipe's updated_at """
+        before = self.recipe.updated_at
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name='Hot'))
+
+        self.recipe.refresh_from_db()
+        self.assertGreater(self.recipe.updated_at, before)
+
+    def test_versions_are_per_user(self):
+        """ Test another user's changes keep this user's ETag valid """
+        etag = self.client.get(RECIPES_URL)['ETag']
+        other = get_user_model().objects.create_user(
+            'other@yopmail.com', 'password123'
+        )
+        Recipe.objects.create(user=other, title='Soup', time_minutes=1,
+                              price=1)
+
+        self.assertNotModified(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+    def test_delete_user_with_recipes(self):
+        """ Test cascading deletes do not recreate the version row """
+        self.user.delete()
+
+        self.assertFalse(CollectionVersion.objects.exists())
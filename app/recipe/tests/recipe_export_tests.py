@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+
+from core.models import Recipe, Tag, Ingredient
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+class RecipeExportApiTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='ansuman123',
+            name='Ansuman Singh'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        curry = Tag.objects.create(user=self.user, name='Curry, hot')
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        self.dal = Recipe.objects.create(
+            user=self.user, title='Dal', time_minutes=30, price='4.50',
+            link='https://example.com/dal'
+        )
+        self.dal.tags.add(vegan, curry)
+        self.dal.ingredients.add(salt)
+        self.plain = Recipe.objects.create(
+            user=self.user, title='Plain', time_minutes=5, price=1
+        )
+        other = get_user_model().objects.create_user(
+            'other@yopmail.com', 'password123'
+        )
+        Recipe.objects.create(user=other, title='Secret', time_minutes=5,
+                              price=1)
+
+    def export(self, **params):
+        res = self.client.get(EXPORT_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        return res, b''.join(res.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        """ Test recipes are streamed one JSON object per line """
+        res, body = self.export()
+
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertIn('recipes.ndjson', res['Content-Disposition'])
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(rows, [
+            {'id': self.dal.id, 'title': 'Dal', 'price': '4.50',
+             'time_minutes': 30, 'link': 'https://example.com/dal',
+             'tags': ['Curry, hot', 'Vegan'], 'ingredients': ['Salt']},
+            {'id': self.plain.id, 'title': 'Plain', 'price': '1.00',
+             'time_minutes': 5, 'link': '', 'tags': [], 'ingredients': []},
+        ])
+
+    def test_export_csv(self):
+        """ Test ?format=csv streams a header and a row per recipe """
+        res, body = self.export(format='csv')
+
+        self.assertEqual(res['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['tags'], 'Curry, hot|Vegan')
+        self.assertEqual(rows[0]['price'], '4.50')
+        self.assertEqual(rows[1]['ingredients'], '')
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_export_queries_per_chunk(self):
+        """ Test names are fetched per chunk, not per recipe """
+        for n in range(3):
+            Recipe.objects.create(user=self.user, title=f'Soup {n}',
+                                  time_minutes=5, price=1)
+
+        with self.assertNumQueries(1 + 5 * 2):
+            _, body = self.export()
+
+        self.assertEqual(len(body.splitlines()), 5)
+
+    def test_export_requires_authentication(self):
+        """ Test anonymous exports are rejected in the requested format """
+        res = APIClient().get(EXPORT_URL, {'format': 'csv'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn(b'detail', res.content)
+
+    def test_export_only_on_recipes(self):
+        """ Test tag and ingredient lists have no export action """
+        for url in ('/api/recipe/tags/export/',
+                    '/api/recipe/ingredient/export/'):
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,111 @@
+from core.models import Recipe, Tag, Ingredient
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def sample_recipe(user, **kwargs):
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': 5.00,
+    }
+    defaults.update(kwargs)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeFilterApiTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='ansuman123',
+            name='Ansuman Singh'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.vegan = Tag.objects.create(user=self.user, name='Vegan')
+        self.curry = Tag.objects.create(user=self.user, name='Curry')
+        self.salt = Ingredient.objects.create(user=self.user, name='Salt')
+        self.dal = sample_recipe(self.user, title='Dal', time_minutes=30,
+                                 price=4)
+        self.dal.tags.add(self.vegan, self.curry)
+        self.dal.ingredients.add(self.salt)
+        self.salad = sample_recipe(self.user, title='Salad',
+                                   time_minutes=5, price=8)
+        self.salad.tags.add(self.vegan)
+        self.steak = sample_recipe(self.user, title='Steak',
+                                   time_minutes=45, price=20)
+
+    def titles(self, **params):
+        res = self.client.get(RECIPES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [r['title'] for r in res.data['results']]
+
+    def test_filter_by_tags_matches_any(self):
+        """ Test recipes with any of the tags are returned once each """
+        titles = self.titles(tags=f'{self.vegan.id},{self.curry.id}')
+
+        self.assertEqual(titles, ['Salad', 'Dal'])
+
+    def test_filter_by_tags_matches_all(self):
+        """ Test match=all only returns recipes having every tag """
+        titles = self.titles(tags=f'{self.vegan.id},{self.curry.id}',
+                             match='all')
+
+        self.assertEqual(titles, ['Dal'])
+
+    def test_filter_ignores_repeated_ids(self):
+        """ Test a repeated id does not make match=all unsatisfiable """
+        titles = self.titles(tags=f'{self.vegan.id},{self.vegan.id}',
+                             match='all')
+
+        self.assertEqual(titles, ['Salad', 'Dal'])
+
+    def test_filter_by_tags_and_ingredients(self):
+        """ Test tag and ingredient filters are combined """
+        titles = self.titles(tags=str(self.vegan.id),
+                             ingredients=str(self.salt.id))
+
+        self.assertEqual(titles, ['Dal'])
+
+    def test_filter_by_ranges(self):
+        """ Test time and price ranges are inclusive """
+        self.assertEqual(
+            self.titles(time_minutes_min=30, time_minutes_max=45),
+            ['Steak', 'Dal'],
+        )
+        self.assertEqual(self.titles(price_max='8.00'), ['Salad', 'Dal'])
+        self.assertEqual(self.titles(price_min=5, time_minutes_max=10),
+                         ['Salad'])
+
+    def test_filter_does_not_leak_other_users(self):
+        """ Test filtering by another user's tag returns nothing of theirs """
+        other = get_user_model().objects.create_user(
+            'other@yopmail.com', 'password123'
+        )
+        tag = Tag.objects.create(user=other, name='Vegan')
+        sample_recipe(other).tags.add(tag)
+
+        self.assertEqual(self.titles(tags=str(tag.id)), [])
+
+    def test_filter_is_a_single_list_query(self):
+        """ Test filtering adds subqueries rather than extra queries """
+        with self.assertNumQueries(2):
+            self.client.get(RECIPES_URL, {
+                'tags': f'{self.vegan.id},{self.curry.id}', 'match': 'all',
+                'ingredients': str(self.salt.id),
+            })
+
+    def test_invalid_filters_rejected(self):
+        """ Test malformed filter values return 400 """
+        for params in ({'tags': 'vegan'}, {'match': 'some'},
+                       {'price_min': 'cheap'}):
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,213 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import skipUnless
+from unittest.mock import patch
+
+from core import images
+from core.models import Recipe
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile, \
+    TemporaryUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def upload_url(recipe_id):
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def image_url(recipe_id):
+    return reverse('recipe:recipe-image', args=[recipe_id])
+
+
+def detail_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def image_file(size=(1200, 900), image_format='JPEG', name='photo.jpg'):
+    content = io.BytesIO()
+    Image.new('RGB', size, 'orange').save(content, image_format)
+    return SimpleUploadedFile(name, content.getvalue())
+
+
+class MediaRootMixin:
+    """ Store uploads in a temporary MEDIA_ROOT """
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.media_root = media_root
+        self.user = get_user_model().objects.create_user(
+            'image@yopmail.com', 'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user, title='Dal', time_minutes=30, price='4.50'
+        )
+
+    def path(self, name):
+        return os.path.join(self.media_root, name)
+
+
+@skipUnless(Image, 'Pillow is not installed')
+@override_settings(RECIPE_IMAGES=dict(settings.RECIPE_IMAGES, WORKERS=0))
+class RecipeImageUploadTests(MediaRootMixin, TransactionTestCase):
+
+    def upload(self, file):
+        return self.client.post(upload_url(self.recipe.id), {'image': file},
+                                format='multipart')
+
+    def test_upload_generates_variants(self):
+        """Test an upload is stored and its variants generated"""
+        res = self.upload(image_file())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('original', res.data['images'])
+        self.recipe.refresh_from_db()
+        name = self.recipe.image.name
+        self.assertTrue(name.endswith('/original.jpg'))
+        self.assertEqual(sorted(self.recipe.image_variants),
+                         ['medium', 'thumb'])
+        with Image.open(self.path(images.variant_name(name, 'thumb'))) \
+                as thumb:
+            self.assertEqual(thumb.format, 'WEBP')
+            self.assertEqual(thumb.size, (200, 150))
+
+        detail = self.client.get(detail_url(self.recipe.id))
+        self.assertEqual(sorted(detail.data['images']),
+                         ['medium', 'original', 'thumb'])
+
+    def test_upload_spooled_to_disk(self):
+        """Test small uploads are not kept in memory either"""
+        with patch('core.images.inspect', wraps=images.inspect) as inspect:
+            self.upload(image_file(size=(10, 10)))
+
+        self.assertIsInstance(inspect.call_args[0][0], TemporaryUploadedFile)
+
+    def test_invalid_image_rejected(self):
+        """Test files that are not images are refused"""
+        res = self.upload(SimpleUploadedFile('photo.jpg', b'not an image'))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+
+    @override_settings(RECIPE_IMAGES=dict(settings.RECIPE_IMAGES,
+                                          WORKERS=0, MAX_UPLOAD_SIZE=1000))
+    def test_large_upload_rejected(self):
+        """Test bodies over MAX_UPLOAD_SIZE are refused before parsing"""
+        res = self.upload(image_file())
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_replace_and_delete_remove_files(self):
+        """Test replaced and deleted images leave no files behind"""
+        self.upload(image_file())
+        self.recipe.refresh_from_db()
+        first = self.path(self.recipe.image.name)
+
+        self.upload(image_file(image_format='PNG', name='photo.png'))
+        self.recipe.refresh_from_db()
+        second = self.path(self.recipe.image.name)
+
+        self.assertFalse(os.path.exists(os.path.dirname(first)))
+        self.assertTrue(second.endswith('original.png'))
+        self.recipe.delete()
+        self.assertFalse(os.path.exists(os.path.dirname(second)))
+
+    def test_generate_image_variants_command(self):
+        """Test the command fills in missing variants"""
+        self.upload(image_file())
+        Recipe.objects.update(image_variants=[])
+
+        call_command('generate_image_variants', stdout=io.StringIO())
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(sorted(self.recipe.image_variants),
+                         ['medium', 'thumb'])
+
+
+class RecipeImageServeTests(MediaRootMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.name = 'uploads/recipe/abc123/original.jpg'
+        os.makedirs(os.path.dirname(self.path(self.name)))
+        for name, content in ((self.name, b'jpeg bytes'),
+                              ('uploads/recipe/abc123/thumb.webp',
+                               b'webp bytes')):
+            with open(self.path(name), 'wb') as f:
+                f.write(content)
+        self.recipe.image = self.name
+        self.recipe.image_variants = ['thumb']
+        self.recipe.save()
+
+    def test_serve_through_django(self):
+        """Test images are streamed without a sendfile header"""
+        res = self.client.get(image_url(self.recipe.id),
+                              HTTP_ACCEPT='image/webp')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'image/jpeg')
+        self.assertEqual(b''.join(res.streaming_content), b'jpeg bytes')
+
+    @override_settings(RECIPE_IMAGES=dict(
+        settings.RECIPE_IMAGES, SENDFILE_HEADER='X-Accel-Redirect'
+    ))
+    def test_serve_with_x_accel_redirect(self):
+        """Test the front server is told which file to send"""
+        res = self.client.get(image_url(self.recipe.id), {
+            'variant': 'thumb', 'v': 'abc123'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'image/webp')
+        self.assertEqual(res['X-Accel-Redirect'],
+                         '/protected-media/uploads/recipe/abc123/thumb.webp')
+        self.assertEqual(res.content, b'')
+        self.assertIn('immutable', res['Cache-Control'])
+
+    def test_stale_upload_not_cached(self):
+        """Test URLs of a previous upload are revalidated"""
+        res = self.client.get(image_url(self.recipe.id), {'v': 'old'})
+
+        self.assertIn('no-cache', res['Cache-Control'])
+
+    def test_missing_variant_and_other_users(self):
+        """Test ungenerated variants and other users' images are 404"""
+        other = get_user_model().objects.create_user('other@yopmail.com',
+                                                     'password123')
+        medium = self.client.get(image_url(self.recipe.id),
+                                 {'variant': 'medium'})
+        self.client.force_authenticate(other)
+        foreign = self.client.get(image_url(self.recipe.id))
+
+        self.assertEqual(medium.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(foreign.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_detail_links_available_variants(self):
+        """Test the detail lists the original and generated variants"""
+        res = self.client.get(detail_url(self.recipe.id))
+
+        url = image_url(self.recipe.id)
+        self.assertEqual(res.data['images'], {
+            'original': f'{url}?variant=original&v=abc123',
+            'thumb': f'{url}?variant=thumb&v=abc123',
+        })
@@ -0,0 +1,101 @@
+from unittest.mock import patch
+from urllib import parse
+
+from core.models import Recipe, Tag
+from django.core import signing
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from recipe.pagination import RecipePagination
+
+RECIPE_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def sample_recipe(user, **kwargs):
+    default = {
+        'title': 'Mushroom Cream Soup',
+        'time_minutes': 5,
+        'price': 50.10
+    }
+    default.update(kwargs)
+    return Recipe.objects.create(user=user, **default)
+
+
+class PaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='ansuman123',
+            name='Ansuman Singh'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def collect_pages(self, url):
+        """ Follow next links and return all ids in page order """
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in res.data['results'])
+            url = res.data['next']
+        return ids
+
+    def test_recipe_pages_cover_every_recipe_once(self):
+        """ Test walking recipe pages returns each recipe in -id order """
+        recipes = [sample_recipe(self.user) for _ in range(7)]
+
+        ids = self.collect_pages(RECIPE_URL + '?page_size=3')
+
+        self.assertEqual(ids, sorted((r.id for r in recipes), reverse=True))
+
+    def test_previous_link_returns_prior_page(self):
+        """ Test the previous link points back at the first page """
+        for _ in range(4):
+            sample_recipe(self.user)
+        first = self.client.get(RECIPE_URL, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+
+        res = self.client.get(second.data['previous'])
+
+        self.assertEqual(res.data['results'], first.data['results'])
+
+    def test_tag_pages_in_name_order(self):
+        """ Test tag pages are ordered by name without gaps or repeats """
+        tags = [Tag.objects.create(user=self.user, name=name)
+                for name in ('Vegan', 'Spicy', 'Sweet', 'Sour', 'Curry')]
+
+        ids = self.collect_pages(TAGS_URL + '?page_size=2')
+
+        expected = sorted(tags, key=lambda t: (t.name, t.id), reverse=True)
+        self.assertEqual(ids, [t.id for t in expected])
+
+    def test_page_size_is_capped(self):
+        """ Test a page size above the cap falls back to the cap """
+        for _ in range(3):
+            sample_recipe(self.user)
+
+        with patch.object(RecipePagination, 'max_page_size', 2):
+            res = self.client.get(RECIPE_URL, {'page_size': 1000})
+
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
+
+    def test_tampered_cursor_rejected(self):
+        """ Test a cursor that was not issued by the server is rejected """
+        for _ in range(3):
+            sample_recipe(self.user)
+        res = self.client.get(RECIPE_URL, {'page_size': 1})
+        query = parse.urlparse(res.data['next']).query
+        cursor = parse.parse_qs(query)['cursor'][0]
+        forged = signing.dumps({'p': '0'}, salt='attacker')
+
+        res = self.client.get(RECIPE_URL, {'cursor': 'x' + cursor[1:]})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.get(RECIPE_URL, {'cursor': forged})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,73 @@
+from core.models import Recipe, Tag, Ingredient
+from core.querycheck import QueryCheckMixin
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+RECIPE_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def detail_url(id):
+    return reverse('recipe:recipe-detail', args=[id])
+
+
+class RecipeQueryCountTests(QueryCheckMixin, TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='ansuman123',
+            name='Ansuman Singh'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_recipes(self, count):
+        """ Create count recipes, each with two tags and ingredients """
+        recipes = []
+        for _ in range(count):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title='Mushroom Cream Soup',
+                time_minutes=5,
+                price=50.10
+            )
+            for name in ('Vegan', 'Dessert'):
+                recipe.tags.add(Tag.objects.create(
+                    user=self.user, name=f'{name} {recipe.id}'
+                ))
+            for name in ('Salt', 'Pepper'):
+                recipe.ingredients.add(Ingredient.objects.create(
+                    user=self.user, name=f'{name} {recipe.id}'
+                ))
+            recipes.append(recipe)
+        return recipes
+
+    def test_recipe_list_query_count_is_constant(self):
+        """ Test listing recipes does not query tags per recipe """
+        count = self.assertConstantQueries(RECIPE_URL, self.add_recipes)
+        # collection version, recipes with their tag and ingredient ids
+        self.assertEqual(count, 2)
+
+    def test_recipe_detail_query_count(self):
+        """ Test recipe detail prefetches nested tags and ingredients """
+        recipe = self.add_recipes(1)[0]
+        with self.assertNumQueries(4):
+            res = self.client.get(detail_url(recipe.id))
+        self.assertEqual(len(res.data['tags']), 2)
+        self.assertEqual(len(res.data['ingredients']), 2)
+
+    def test_tag_recipe_count_query_count_is_constant(self):
+        """ Test recipe_count does not count recipes tag by tag """
+        count = self.assertConstantQueries(f'{TAGS_URL}?recipe_count=1',
+                                           self.add_recipes)
+        # collection version, tags, recipe counts of the page
+        self.assertEqual(count, 3)
+
+    def test_recipe_detail_repeats_no_query(self):
+        """ Test the detail view fetches each relation once """
+        recipe = self.add_recipes(1)[0]
+        with self.assertNoDuplicateQueries():
+            self.client.get(detail_url(recipe.id))
@@ -0,0 +1,137 @@
+from core.models import Recipe, Tag, Ingredient
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch
+
+from recipe import filters
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def sample_recipe(user, **kwargs):
+    defaults = {
+        'title': 'Sample recipe',
+        'time_minutes': 10,
+        'price': 5.00,
+    }
+    defaults.update(kwargs)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeSearchApiTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='ansuman123',
+            name='Ansuman Singh'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.curry = Tag.objects.create(user=self.user, name='Curry')
+        self.lentil = Ingredient.objects.create(user=self.user,
+                                                name='Lentils')
+        self.dal = sample_recipe(self.user, title='Lentil dal')
+        self.dal.tags.add(self.curry)
+        self.dal.ingredients.add(self.lentil)
+        self.korma = sample_recipe(self.user, title='Chicken korma')
+        self.korma.tags.add(self.curry)
+        self.soup = sample_recipe(self.user, title='Tomato soup')
+        self.soup.ingredients.add(self.lentil)
+
+    def titles(self, **params):
+        res = self.client.get(RECIPES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [r['title'] for r in res.data['results']]
+
+    def test_search_by_title(self):
+        """ Test searching matches stemmed words of the title """
+        self.assertEqual(self.titles(search='soups'), ['Tomato soup'])
+
+    def test_search_by_tag_and_ingredient_names(self):
+        """ Test tag and ingredient names are searchable """
+        self.assertEqual(self.titles(search='curry'),
+                         ['Chicken korma', 'Lentil dal'])
+        self.assertEqual(self.titles(search='lentils'),
+                         ['Lentil dal', 'Tomato soup'])
+
+    def test_search_ranks_title_above_relations(self):
+        """ Test a title match ranks above a tag or ingredient match """
+        soup = sample_recipe(self.user, title='Curry soup')
+
+        self.assertEqual(self.titles(search='curry')[0], soup.title)
+
+    def test_vector_follows_relation_changes(self):
+        """ Test adding, removing and renaming tags updates the vectors """
+        spicy = Tag.objects.create(user=self.user, name='Spicy')
+        self.soup.tags.add(spicy)
+        self.assertEqual(self.titles(search='spicy'), ['Tomato soup'])
+
+        spicy.recipe_set.remove(self.soup)
+        self.assertEqual(self.titles(search='spicy'), [])
+
+        self.curry.name = 'Masala'
+        self.curry.save()
+        self.assertEqual(self.titles(search='masala'),
+                         ['Chicken korma', 'Lentil dal'])
+
+        self.lentil.recipe_set.clear()
+        self.assertEqual(self.titles(search='lentils'), ['Lentil dal'])
+
+        self.curry.delete()
+        self.assertEqual(self.titles(search='masala'), [])
+
+    def test_vector_follows_title(self):
+        """ Test saving a new title updates the vector """
+        self.soup.title = 'Gazpacho'
+        self.soup.save()
+
+        self.assertEqual(self.titles(search='gazpacho'), ['Gazpacho'])
+        self.assertEqual(self.titles(search='tomato'), [])
+
+    def test_search_pages_by_rank(self):
+        """ Test search results page through the cursor in rank order,
+        ties broken by the newest recipe first """
+        sample_recipe(self.user, title='Curry soup')
+        titles = []
+        url, params = RECIPES_URL, {'search': 'curry', 'page_size': 1}
+        while url:
+            res = self.client.get(url, params)
+            titles += [r['title'] for r in res.data['results']]
+            url, params = res.data['next'], None
+
+        self.assertEqual(titles, ['Curry soup', 'Chicken korma',
+                                  'Lentil dal'])
+
+    def test_search_combines_with_filters(self):
+        """ Test search narrows the other list filters """
+        titles = self.titles(search='lentils', tags=str(self.curry.id))
+
+        self.assertEqual(titles, ['Lentil dal'])
+
+    def test_search_too_long_rejected(self):
+        """ Test overly long search text is a bad request """
+        res = self.client.get(RECIPES_URL, {'search': 'x' * 201})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_trigrams_only_tried_for_empty_results(self):
+        """ Test searches with matches never look for pg_trgm """
+        with patch('recipe.views.trigram_enabled',
+                   return_value=False) as enabled:
+            self.assertEqual(self.titles(search='soups'), ['Tomato soup'])
+            enabled.assert_not_called()
+
+            self.assertEqual(self.titles(search='tomatto'), [])
+            enabled.assert_called_once()
+
+    def test_search_falls_back_to_trigrams(self):
+        """ Test a misspelt title still finds the recipe """
+        filters._trigram_enabled.clear()
+        if not filters.trigram_enabled('default'):
+            self.skipTest('pg_trgm is not installed')
+        self.assertEqual(self.titles(search='tomatto'), ['Tomato soup'])
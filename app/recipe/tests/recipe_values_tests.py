@@ -0,0 +1,78 @@
+from core.models import Recipe, Tag, Ingredient
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class ValuesListParityTests(TestCase):
+    """ The values() fast path must render exactly what the serializers
+    render, byte for byte """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='ansuman123',
+            name='Ansuman Singh'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        tags = [Tag.objects.create(user=self.user, name=name)
+                for name in ('Vegan', 'Curry', 'Üñíçødé\u2028tag')]
+        ingredients = [Ingredient.objects.create(user=self.user, name=name)
+                       for name in ('Salt', 'Dal', 'Ghee')]
+        for n, price in enumerate(('0.50', '5', '12345.67', '99.9')):
+            recipe = Recipe.objects.create(
+                user=self.user, title=f'Recipe "{n}"', price=price,
+                time_minutes=n * 7
+            )
+            recipe.tags.add(*reversed(tags[:n]))
+            recipe.ingredients.add(*ingredients[n % 3:])
+        # Recipe and tag without any relations
+        Recipe.objects.create(user=self.user, title='Plain', price=1,
+                              time_minutes=1)
+        Tag.objects.create(user=self.user, name='Unused')
+
+    def assertParity(self, url, params=None):
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            slow = self.client.get(url, params)
+        fast = self.client.get(url, params)
+
+        self.assertEqual(fast.status_code, slow.status_code)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_recipe_list_parity(self):
+        """ Test recipe lists, including filtered ones, are identical """
+        res = self.assertParity(RECIPES_URL)
+        self.assertEqual(len(res.data['results']), 5)
+
+        tag = Tag.objects.get(name='Vegan')
+        self.assertParity(RECIPES_URL, {'tags': str(tag.id)})
+        self.assertParity(RECIPES_URL, {'price_max': 10, 'page_size': 2})
+
+    def test_recipe_list_next_page_parity(self):
+        """ Test the cursor of the next page is computed the same way """
+        first = self.assertParity(RECIPES_URL, {'page_size': 2})
+
+        self.assertParity(first.data['next'])
+
+    def test_tag_and_ingredient_list_parity(self):
+        """ Test tag and ingredient lists are identical """
+        self.assertParity(TAGS_URL)
+        self.assertParity(TAGS_URL, {'assigned_only': 1})
+        self.assertParity(INGREDIENTS_URL)
+
+    def test_browsable_api_parity(self):
+        """ Test the HTML renderer gets identical data """
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            slow = self.client.get(RECIPES_URL, HTTP_ACCEPT='text/html')
+        fast = self.client.get(RECIPES_URL, HTTP_ACCEPT='text/html')
+
+        self.assertEqual(fast.data, slow.data)
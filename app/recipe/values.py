@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import IntegerField, OuterRef, Subquery
+
+from core.metrics import serializing
+
+
+class ValuesSerializer:
+    """ Read-only fast path for a ModelSerializer(many=True) on list
+    actions. Rows come from values() with the given many-to-many pk
+    fields aggregated by ArrayAgg in the same query, and each column goes
+    through the serializer's own field.to_representation, so the output
+    is identical without per-instance ModelSerializer overhead.
+
+    Each relation is a correlated subquery on the through table rather
+    than a join: joining two relations multiplies their rows before the
+    GROUP BY, while the subqueries only run for the rows of the page """
+
+    def __init__(self, serializer_class, relations=()):
+        self.relations = relations
+        # (name, converter) in output order, relations have no converter
+        self.fields = [
+            (name, None if name in relations else field.to_representation)
+            for name, field in serializer_class().fields.items()
+            if not field.write_only
+        ]
+
+    def get_queryset(self, queryset):
+        """ Turn a model queryset into one of values() rows, keeping its
+        annotations for ordering and pagination """
+        columns = [name for name, convert in self.fields if convert]
+        columns += queryset.query.annotation_select
+        aggregates = {
+            f'{name}_ids': self.related_ids(queryset.model, name)
+            for name in self.relations
+        }
+        return queryset.prefetch_related(None).values(*columns)\
+            .annotate(**aggregates)
+
+    @staticmethod
+    def related_ids(model, name):
+        """ Sorted pks linked through a many-to-many field, NULL if none """
+        m2m = model._meta.get_field(name)
+        source = f'{m2m.m2m_field_name()}_id'
+        target = f'{m2m.m2m_reverse_field_name()}_id'
+        ids = m2m.remote_field.through.objects\
+            .filter(**{source: OuterRef('pk')})\
+            .values(source)\
+            .annotate(ids=ArrayAgg(target, ordering=target))\
+            .values('ids')
+        return Subquery(ids, output_field=ArrayField(IntegerField()))
+
+    def to_representation(self, rows):
+        data = []
+        for row in rows:
+            item = {}
+            for name, convert in self.fields:
+                if convert is None:
+                    item[name] = row[f'{name}_ids'] or []
+                else:
+                    value = row[name]
+                    item[name] = None if value is None else convert(value)
+            data.append(item)
+        return data
+
+
+class ValuesListMixin:
+    """ Serve list actions through ValuesSerializer when enabled by
+    settings.FAST_LIST_SERIALIZATION and the default serializer applies """
+    values_relations = ()
+
+    def use_values_list(self):
+        return getattr(settings, 'FAST_LIST_SERIALIZATION', True) and \
+            self.get_serializer_class() is self.serializer_class
+
+    def get_values_serializer(self):
+        if not hasattr(self, '_values_serializer'):
+            self._values_serializer = ValuesSerializer(
+                self.serializer_class, self.values_relations
+            )
+        return self._values_serializer
+
+    def get_list_queryset(self):
+        """ Filtered queryset the list action pages through, of values()
+        rows when served through ValuesSerializer """
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.use_values_list():
+            queryset = self.get_values_serializer().get_queryset(queryset)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_values_list():
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(self.get_list_queryset())
+        with serializing():
+            data = self.get_values_serializer().to_representation(page)
+        return self.get_paginated_response(data)
@@ -1,49 +1,223 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
 from core.models import Tag, Ingredient, Recipe
-from rest_framework.authentication import TokenAuthentication
-from rest_framework import viewsets, mixins
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from core import images
+from core.export import export_recipes
+from core.renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer, \
+    PassthroughRenderer
+from user.authentication import CachedTokenAuthentication
+from recipe.caching import CachedResponseMixin
+from recipe.filters import AttributeFilterSerializer, QueryFiltersMixin, \
+    RecipeFilterSerializer, add_recipe_counts, filter_attributes, \
+    filter_recipes, trigram_enabled
+from recipe.pagination import NamePagination, RecipePagination, \
+    SearchPagination
+from recipe.values import ValuesListMixin
 from recipe.serializers import TagSerializer, IngredientSerializer,\
-    RecipeSerializer, RecipeDetailSerializer
+    RecipeSerializer, RecipeDetailSerializer, RecipeBulkSerializer, \
+    RecipeImageSerializer, TagCountSerializer, IngredientCountSerializer
 
 
-class AppViewSet(viewsets.GenericViewSet,
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Request body too large.'
+    default_code = 'upload_too_large'
+
+
+class AppViewSet(CachedResponseMixin,
+                 QueryFiltersMixin,
+                 ValuesListMixin,
+                 viewsets.GenericViewSet,
                  mixins.ListModelMixin,
                  mixins.CreateModelMixin):
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = NamePagination
+    filter_serializer_class = AttributeFilterSerializer
+
+    count_serializer_class = None
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user).order_by('-name')
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == 'list':
+            queryset = filter_attributes(queryset, self.get_filters())
+        return queryset.order_by('-name', '-id')
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.get_filters()['recipe_count']:
+            add_recipe_counts(page)
+        return page
+
+    def get_serializer_class(self):
+        """ Include recipe_count only when it was asked for """
+        if self.action == 'list' and self.get_filters()['recipe_count']:
+            return self.count_serializer_class
+        return self.serializer_class
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        """ A concurrent request may take the name after validate_name
+        checked it, the unique lower(name) index then rejects the insert """
+        try:
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
+        except IntegrityError:
+            name = serializer.validated_data['name']
+            raise ValidationError({'name': [serializer.name_taken(name)]})
 
 
 class TagViewSet(AppViewSet):
     serializer_class = TagSerializer
+    count_serializer_class = TagCountSerializer
     queryset = Tag.objects.all()
 
 
 class IngredientViewSet(AppViewSet):
     serializer_class = IngredientSerializer
+    count_serializer_class = IngredientCountSerializer
     queryset = Ingredient.objects.all()
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(CachedResponseMixin, QueryFiltersMixin, ValuesListMixin,
+                    viewsets.ModelViewSet):
     serializer_class = RecipeSerializer
+    values_relations = ('tags', 'ingredients')
     queryset = Recipe.objects.all()
     permission_classes = (IsAuthenticated,)
-    authentication_classes= (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
+    pagination_class = RecipePagination
+    filter_serializer_class = RecipeFilterSerializer
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""
         if self.action == 'retrieve':
             return RecipeDetailSerializer
+        if self.action == 'bulk':
+            return RecipeBulkSerializer
+        if self.action == 'upload_image':
+            return RecipeImageSerializer
         return self.serializer_class
-    
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Create a new recipe"""
         serializer.save(user=self.request.user)
-    
+
+    @action(methods=['post'], detail=False)
+    def bulk(self, request):
+        """Create a list of recipes in one transaction"""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.save(user=request.user)
+        prefetch_related_objects(recipes, *self.get_related_prefetches())
+        data = RecipeSerializer(recipes, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(methods=['post'], detail=True, url_path='upload-image',
+            parser_classes=(MultiPartParser,))
+    def upload_image(self, request, pk=None):
+        """Upload an image, its variants are generated after responding"""
+        recipe = self.get_object()
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if length > settings.RECIPE_IMAGES['MAX_UPLOAD_SIZE']:
+            raise UploadTooLarge
+        images.upload_to_disk(request._request)
+        serializer = self.get_serializer(recipe, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+    @action(methods=['get'], detail=True,
+            renderer_classes=(FastJSONRenderer, PassthroughRenderer))
+    def image(self, request, pk=None):
+        """Send the image, or ?variant= one of its generated variants"""
+        recipe = self.get_object()
+        variant = request.query_params.get('variant', 'original')
+        if not recipe.image or variant not in ('original',
+                                               *recipe.image_variants):
+            raise Http404
+        response = images.file_response(
+            images.variant_name(recipe.image.name, variant)
+        )
+        # Uploads get a new directory, so a URL with the current one
+        # always returns the same bytes
+        if request.query_params.get('v') == images.upload_id(
+                recipe.image.name):
+            patch_cache_control(response, private=True, max_age=31536000,
+                                immutable=True)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    @action(methods=['get'], detail=False,
+            renderer_classes=(NDJSONRenderer, CSVRenderer))
+    def export(self, request):
+        """Stream all recipes of the user, ?format=ndjson (default) or csv"""
+        renderer = request.accepted_renderer
+        rows = export_recipes(self.get_queryset(),
+                              chunk_size=settings.EXPORT_CHUNK_SIZE)
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f'; charset={renderer.charset}'
+        response = StreamingHttpResponse(renderer.lines(rows),
+                                         content_type=content_type)
+        response['Content-Disposition'] = \
+            f'attachment; filename="recipes.{renderer.format}"'
+        return response
+
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == 'list':
+            queryset = filter_recipes(queryset, self.get_filters())
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.prefetch_related(
+                *self.get_related_prefetches()
+            )
+        elif self.action == 'image':
+            queryset = queryset.only('image', 'image_variants')
+        return queryset.order_by('-id')
+
+    def paginate_queryset(self, queryset):
+        """ A search matching nothing is retried on title similarity if
+        pg_trgm is installed. Only empty pages pay for the second query """
+        page = super().paginate_queryset(queryset)
+        filters = self.get_filters()
+        if page or not filters.get('search') or filters.get('similar') \
+                or not trigram_enabled(queryset.db):
+            return page
+        self._filters = dict(filters, similar=True)
+        return super().paginate_queryset(self.get_list_queryset())
+
+    @property
+    def paginator(self):
+        """ Searches are ordered by rank instead of id """
+        if not hasattr(self, '_paginator'):
+            search = self.action == 'list' and self.get_filters().get('search')
+            pagination = SearchPagination if search else self.pagination_class
+            self._paginator = pagination()
+        return self._paginator
+
+    def get_related_prefetches(self):
+        """ Prefetch tags and ingredients with only the columns the
+        serializer for the current action renders. Writes skip this as
+        DRF drops the prefetch cache before serializing the response.
+        Ordering by recipe first lets Postgres read the through table's
+        (recipe_id, tag_id) index in order instead of sorting """
+        fields = ('id', 'name') if self.action == 'retrieve' else ('id',)
+        return (
+            Prefetch('tags', queryset=Tag.objects.only(*fields)
+                     .order_by('recipe', 'id')),
+            Prefetch('ingredients', queryset=Ingredient.objects.only(*fields)
+                     .order_by('recipe', 'id')),
+        )
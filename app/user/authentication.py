@@ -0,0 +1,119 @@
+import pickle
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+from core.cache import LRUCache
+from core.metrics import registry
+
+TOKEN_CACHE = getattr(settings, 'TOKEN_CACHE', {})
+KEY_PREFIX = 'auth-token:'
+
+
+class TokenCache:
+    """ Token key -> authenticated token (with its user) lookups, kept in
+    a local LRU and optionally in a shared Django cache. Entries are
+    pickled so requests never share one mutable User instance """
+
+    def __init__(self, max_size=10000, ttl=60, cache_alias=None):
+        self.ttl = ttl
+        self.local = LRUCache(max_size=max_size, ttl=ttl)
+        self.cache_alias = cache_alias
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def get(self, key):
+        data = self.local.get(key)
+        if data is not None:
+            self._count('local_hits')
+        elif self.shared is not None:
+            data = self.shared.get(KEY_PREFIX + key)
+            if data is not None:
+                self._count('shared_hits')
+                self.local.set(key, data)
+        if data is None:
+            self._count('misses')
+            return None
+        return pickle.loads(data)
+
+    def set(self, key, token):
+        data = pickle.dumps(token)
+        self.local.set(key, data)
+        if self.shared is not None:
+            self.shared.set(KEY_PREFIX + key, data, self.ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete_many([KEY_PREFIX + key for key in keys])
+
+    def clear(self):
+        self.local.clear()
+        self.reset_stats()
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def reset_stats(self):
+        self._stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    def stats(self):
+        """ Hit counters and the overall hit ratio """
+        stats = dict(self._stats)
+        hits = stats['local_hits'] + stats['shared_hits']
+        lookups = hits + stats['misses']
+        stats['hit_ratio'] = hits / lookups if lookups else 0.0
+        return stats
+
+
+token_cache = TokenCache(
+    max_size=TOKEN_CACHE.get('MAX_SIZE', 10000),
+    ttl=TOKEN_CACHE.get('TTL', 60),
+    cache_alias=TOKEN_CACHE.get('CACHE_ALIAS'),
+)
+
+
+# token_cache.stats() key: lookups_total result label
+LOOKUP_RESULTS = (('local_hits', 'local_hit'), ('shared_hits', 'shared_hit'),
+                  ('misses', 'miss'))
+
+
+def collect_token_cache():
+    """ token_cache counters for the /metrics endpoint """
+    stats = token_cache.stats()
+    return [
+        '# HELP token_cache_lookups_total Token lookups by where they were '
+        'answered',
+        '# TYPE token_cache_lookups_total counter',
+        *(f'token_cache_lookups_total{{result="{result}"}} {stats[key]}'
+          for key, result in LOOKUP_RESULTS),
+        '# HELP token_cache_hit_ratio Share of token lookups answered by '
+        'the local or shared cache',
+        '# TYPE token_cache_hit_ratio gauge',
+        f'token_cache_hit_ratio {stats["hit_ratio"]}',
+    ]
+
+
+registry.add_collector(collect_token_cache)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """ Token authentication that resolves known tokens from token_cache
+    instead of joining Token and User on every request """
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is not None:
+            return (token.user, token)
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, token)
+        return (user, token)
@@ -0,0 +1,96 @@
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, get_hasher, \
+    identify_hasher, make_password
+
+from core.cache import LazyExecutor
+
+PASSWORD_VERIFY_POOL = getattr(settings, 'PASSWORD_VERIFY_POOL', {})
+
+
+class PasswordCheckBusy(Exception):
+    """ No password check slot freed up within the timeout """
+
+
+class VerifyPool:
+    """ Runs password hashing on a few threads. hashlib, argon2-cffi and
+    bcrypt release the GIL while hashing, so a login storm uses at most
+    `workers` cores per process and request threads serving other
+    endpoints keep running. At most max_pending calls run or wait, the
+    rest fail with PasswordCheckBusy after timeout seconds. With no
+    workers calls run inline.
+
+    Only hashing runs on the pool: its threads never touch the database
+    and so never hold connections """
+
+    def __init__(self, workers=2, max_pending=16, timeout=5):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._executor = LazyExecutor(thread_name_prefix='password-check')
+
+    def run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordCheckBusy
+        try:
+            executor = self._executor.get(self.workers)
+            return executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def check(self, password, encoded):
+        """ Whether password matches the encoded hash """
+        return self.run(check_password, password, encoded)
+
+
+verify_pool = VerifyPool(
+    workers=PASSWORD_VERIFY_POOL.get('WORKERS', 2),
+    max_pending=PASSWORD_VERIFY_POOL.get('MAX_PENDING', 16),
+    timeout=PASSWORD_VERIFY_POOL.get('TIMEOUT', 5),
+)
+
+
+def must_update(encoded):
+    """ Whether encoded was made by another hasher than the preferred one
+    or with other costs, the same test check_password uses """
+    preferred = get_hasher()
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or \
+        preferred.must_update(encoded)
+
+
+class PooledModelBackend(ModelBackend):
+    """ ModelBackend hashing passwords on verify_pool. After a successful
+    check an outdated hash is replaced, upgrading users to the configured
+    hasher and costs as they log in """
+
+    def authenticate(self, request, username=None, password=None,
+                     **kwargs):
+        user_model = get_user_model()
+        if username is None:
+            username = kwargs.get(user_model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = user_model._default_manager.get_by_natural_key(username)
+        except user_model.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            verify_pool.run(make_password, password)
+            return None
+
+        if not verify_pool.check(password, user.password):
+            return None
+        if must_update(user.password):
+            user.password = verify_pool.run(make_password, password)
+            user.save(update_fields=['password'])
+        if self.user_can_authenticate(user):
+            return user
+        return None
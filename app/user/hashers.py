@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """ Iterations from settings.PASSWORD_PBKDF2_ITERATIONS """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS',
+                       super().iterations)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """ Costs from settings.PASSWORD_ARGON2_*, memory in KiB """
+
+    @property
+    def time_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_TIME_COST',
+                       super().time_cost)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST',
+                       super().memory_cost)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_ARGON2_PARALLELISM',
+                       super().parallelism)
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """ Rounds from settings.PASSWORD_BCRYPT_ROUNDS """
+
+    @property
+    def rounds(self):
+        return getattr(settings, 'PASSWORD_BCRYPT_ROUNDS', super().rounds)
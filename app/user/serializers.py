@@ -1,9 +1,15 @@
+import hashlib
+
 from django.contrib.auth import get_user_model, authenticate
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
 from django.utils.translation import ugettext_lazy as _
 
+from core.cache import SingleFlight
+from core.metrics import TimedSerializerMixin
+from user.backends import PasswordCheckBusy
+
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
         fields = ('email', 'password', 'name')
@@ -27,6 +33,20 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+# Concurrent token requests with the same credentials share one check
+login_flight = SingleFlight()
+
+
+class PasswordCheckUnavailable(exceptions.APIException):
+    """ Too many logins are being checked, retry shortly """
+    status_code = 503
+    default_detail = _('Too many login attempts in progress, '
+                       'try again shortly.')
+    default_code = 'password_check_busy'
+    # Sent as Retry-After by the DRF exception handler
+    wait = 1
+
+
 class AuthTokenSerializer(serializers.Serializer):
     """Serialize for the user authentication object"""
     email = serializers.CharField()
@@ -38,14 +58,19 @@ class AuthTokenSerializer(serializers.Serializer):
     def validate(self, attrs):
         """ validate and authenticate the user"""
 
-        email = attrs.get('email')
+        email = get_user_model().objects.normalize_email(attrs.get('email'))
         password = attrs.get('password')
+        # Keyed like EmailThrottle, without keeping the password around
+        key = (email, hashlib.sha256(password.encode()).hexdigest())
 
-        user = authenticate(
-            request=self.context.get('request'),
-            username=email,
-            password=password
-        )
+        try:
+            user = login_flight.do(key, lambda: authenticate(
+                request=self.context.get('request'),
+                username=email,
+                password=password
+            ))
+        except PasswordCheckBusy:
+            raise PasswordCheckUnavailable
 
         if not user:
             msg = _('Unable to Authenticate with current credentials')
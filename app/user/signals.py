@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    """ A deleted token must stop authenticating immediately """
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def evict_user_tokens(sender, instance, created, **kwargs):
+    """ Drop cached tokens of a changed user, so is_active flips take
+    effect and request.user never serves stale profile fields """
+    if created:
+        return
+    keys = list(Token.objects.filter(user=instance)
+                .values_list('key', flat=True))
+    if keys:
+        token_cache.delete(*keys)
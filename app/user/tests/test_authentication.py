@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.cache import LRUCache
+from user.authentication import token_cache
+
+ME_URL = reverse('user:me')
+
+
+class LRUCacheTests(TestCase):
+
+    def test_least_recently_used_evicted(self):
+        """Test the oldest untouched entry is dropped when full"""
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_entries_expire(self):
+        """Test entries are not returned after their ttl"""
+        now = [100.0]
+        cache = LRUCache(ttl=10, clock=lambda: now[0])
+        cache.set('a', 1)
+        now[0] += 11
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='ansuman@yopmail.com',
+            password='testpass',
+            name='Ansuman Singh'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def tearDown(self):
+        token_cache.clear()
+
+    def test_repeat_requests_skip_token_query(self):
+        """Test a cached token authenticates without touching the db"""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+        self.assertEqual(token_cache.stats()['hit_ratio'], 0.5)
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_stats_exported_as_metrics(self):
+        """Test hits, misses and the hit ratio are on /metrics"""
+        self.client.get(ME_URL)
+        self.client.get(ME_URL)
+
+        body = self.client.get(reverse('metrics')).content.decode()
+
+        self.assertIn('token_cache_lookups_total{result="local_hit"} 1',
+                      body)
+        self.assertIn('token_cache_lookups_total{result="shared_hit"} 0',
+                      body)
+        self.assertIn('token_cache_lookups_total{result="miss"} 1', body)
+        self.assertIn('token_cache_hit_ratio 0.5', body)
+
+    def test_deleted_token_rejected(self):
+        """Test deleting a token evicts it from the cache"""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test flipping is_active evicts the user's tokens"""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_not_served_stale(self):
+        """Test the cached user is refreshed after a profile update"""
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {'name': 'new name'})
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'new name')
+
+    def test_profile_update_ignores_stale_cached_user(self):
+        """Test a stale cached user is not written back on update"""
+        self.client.get(ME_URL)
+        stale = token_cache.local.get(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        token_cache.local.set(self.token.key, stale)
+
+        res = self.client.patch(ME_URL, {'name': 'new name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.user.name, 'new name')
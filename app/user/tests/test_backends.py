@@ -0,0 +1,135 @@
+import threading
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.backends import PasswordCheckBusy, VerifyPool
+
+try:
+    import argon2
+except ImportError:
+    argon2 = None
+
+TOKEN_URL = reverse('user:token')
+
+
+class VerifyPoolTests(SimpleTestCase):
+
+    def test_runs_on_pool_threads(self):
+        """Test calls run on the pool and return their result"""
+        pool = VerifyPool(workers=1)
+
+        name = pool.run(lambda: threading.current_thread().name)
+
+        self.assertTrue(name.startswith('password-check'))
+
+    def test_full_pool_fails_after_timeout(self):
+        """Test calls beyond max_pending give up instead of queueing"""
+        pool = VerifyPool(workers=1, max_pending=1, timeout=0.01)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        waiting = threading.Thread(target=pool.run, args=(block,))
+        waiting.start()
+        started.wait()
+        try:
+            with self.assertRaises(PasswordCheckBusy):
+                pool.run(lambda: None)
+        finally:
+            release.set()
+            waiting.join()
+        self.assertIsNone(pool.run(lambda: None))
+
+    def test_no_workers_runs_inline(self):
+        """Test a pool without workers calls in the current thread"""
+        name = VerifyPool(workers=0).run(
+            lambda: threading.current_thread().name
+        )
+
+        self.assertEqual(name, threading.current_thread().name)
+
+
+class PooledModelBackendTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'backend@example.com', 'testpass123'
+        )
+
+    def login(self, password='testpass123'):
+        return authenticate(username='backend@example.com',
+                            password=password)
+
+    def test_login(self):
+        """Test right, wrong and unknown credentials"""
+        self.assertEqual(self.login(), self.user)
+        self.assertIsNone(self.login('wrong'))
+        self.assertIsNone(authenticate(username='nobody@example.com',
+                                       password='testpass123'))
+
+    def test_inactive_user_rejected(self):
+        """Test inactive users cannot log in with the right password"""
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(self.login())
+
+    def test_cost_change_rehashes_on_login(self):
+        """Test a hash made with other iterations is upgraded on login"""
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.user.set_password('testpass123')
+            self.user.save()
+        old = self.user.password
+
+        self.assertEqual(self.login(), self.user)
+
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.password, old)
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$180000$'))
+        self.assertEqual(self.login(), self.user)
+
+    def test_wrong_password_keeps_hash(self):
+        """Test failed logins never rewrite the hash"""
+        self.user.password = make_password('testpass123',
+                                           hasher='pbkdf2_sha1')
+        self.user.save()
+        old = self.user.password
+
+        self.assertIsNone(self.login('wrong'))
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, old)
+
+    @skipUnless(argon2, 'argon2-cffi is not installed')
+    def test_login_upgrades_to_preferred_hasher(self):
+        """Test switching the preferred hasher upgrades users on login"""
+        hashers = [
+            'user.hashers.Argon2PasswordHasher',
+            'user.hashers.PBKDF2PasswordHasher',
+        ]
+        with override_settings(PASSWORD_HASHERS=hashers):
+            self.assertEqual(self.login(), self.user)
+
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('argon2$'))
+            self.assertEqual(self.login(), self.user)
+
+    def test_busy_pool_returns_503(self):
+        """Test token requests are shed with Retry-After when busy"""
+        with patch('user.backends.verify_pool.check',
+                   side_effect=PasswordCheckBusy):
+            res = APIClient().post(TOKEN_URL, {
+                'email': 'backend@example.com', 'password': 'testpass123'
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '1')
@@ -0,0 +1,160 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.serializers import AuthTokenSerializer, login_flight
+from user.throttling import IPThrottle
+
+TOKEN_URL = reverse('user:token')
+CREATE_USER_URL = reverse('user:create')
+
+
+def rates(**overrides):
+    """ REST_FRAMEWORK settings with the given throttle rates """
+    return dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=dict(
+        settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **overrides
+    ))
+
+
+class TokenBucketTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+        self.throttle = IPThrottle()
+        self.throttle.timer = lambda: self.now
+        self.throttle.num_requests, self.throttle.duration = 3, 60
+
+    def test_burst_then_refill(self):
+        """Test a full bucket allows a burst, then one token per interval"""
+        results = [self.throttle.consume('key') for _ in range(4)]
+
+        self.assertEqual(results[:3], [0, 0, 0])
+        self.assertEqual(results[3], 20)
+
+        self.now += 20
+        self.assertEqual(self.throttle.consume('key'), 0)
+        self.assertGreater(self.throttle.consume('key'), 0)
+
+    def test_denied_requests_do_not_drain(self):
+        """Test retrying while throttled does not push the wait further"""
+        for _ in range(3):
+            self.throttle.consume('key')
+        waits = [self.throttle.consume('key') for _ in range(5)]
+
+        self.assertEqual(set(waits), {20})
+
+    def test_idle_bucket_refills_to_capacity(self):
+        """Test a long idle bucket allows a full burst again, no more"""
+        for _ in range(3):
+            self.throttle.consume('key')
+        self.now += 3600
+
+        results = [self.throttle.consume('key') for _ in range(4)]
+
+        self.assertEqual(results[:3], [0, 0, 0])
+        self.assertGreater(results[3], 0)
+
+
+class AuthThrottleApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        get_user_model().objects.create_user('throttle@example.com',
+                                             'testpass123')
+
+    def post_token(self, email='throttle@example.com', **extra):
+        return self.client.post(TOKEN_URL, {
+            'email': email, 'password': 'wrong'
+        }, **extra)
+
+    @override_settings(REST_FRAMEWORK=rates(token_ip='2/min'))
+    def test_token_throttled_by_address(self):
+        """Test token requests from one address are limited"""
+        for n in range(2):
+            self.post_token(f'user{n}@example.com')
+
+        res = self.post_token('other@example.com')
+        elsewhere = self.post_token('other@example.com',
+                                    REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res['Retry-After'], '30')
+        self.assertEqual(elsewhere.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(REST_FRAMEWORK=rates(token_email='2/min'))
+    def test_token_throttled_by_normalized_email(self):
+        """Test case variations of an email share one bucket"""
+        self.post_token('Throttle@Example.com', REMOTE_ADDR='10.0.0.1')
+        self.post_token('throttle@example.com', REMOTE_ADDR='10.0.0.2')
+
+        res = self.post_token('THROTTLE@EXAMPLE.COM', REMOTE_ADDR='10.0.0.3')
+        other = self.post_token('other@example.com', REMOTE_ADDR='10.0.0.3')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(REST_FRAMEWORK=rates(signup_ip='1/hour'))
+    def test_signup_throttled(self):
+        """Test account creation is limited per address"""
+        payload = {'email': 'new@example.com', 'password': 'testpass123',
+                   'name': 'New'}
+        first = self.client.post(CREATE_USER_URL, payload)
+        second = self.client.post(CREATE_USER_URL,
+                                  dict(payload, email='new2@example.com'))
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class LoginCoalescingTests(SimpleTestCase):
+
+    def test_concurrent_identical_logins_share_one_check(self):
+        """Test identical in-flight token requests verify only once, also
+        when the email differs in case"""
+        started = threading.Event()
+        calls = []
+        keys = []
+        results = []
+
+        def slow_authenticate(**credentials):
+            calls.append((credentials['username'], credentials['password']))
+            keys.extend(login_flight._calls)
+            started.set()
+            time.sleep(0.1)
+
+        def login(password='testpass123', email='same@example.com'):
+            serializer = AuthTokenSerializer(data={
+                'email': email, 'password': password
+            })
+            results.append(serializer.is_valid())
+
+        with patch('user.serializers.authenticate',
+                   side_effect=slow_authenticate):
+            threads = [threading.Thread(target=login)]
+            threads[0].start()
+            started.wait()
+            threads += [threading.Thread(target=login) for _ in range(2)]
+            threads.append(threading.Thread(
+                target=login, kwargs={'email': 'Same@Example.COM'}
+            ))
+            threads.append(threading.Thread(target=login, args=('other',)))
+            for thread in threads[1:]:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(calls), [('same@example.com', 'other'),
+                                         ('same@example.com', 'testpass123')])
+        self.assertEqual(results, [False] * 5)
+        self.assertFalse(any('testpass123' in key for key in keys))
@@ -0,0 +1,106 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """ Token bucket holding N tokens refilled evenly over the period of
+    an 'N/period' rate. The rate is DEFAULT_THROTTLE_RATES of
+    '<view.throttle_scope>_<scope_suffix>'; views without a
+    throttle_scope are not throttled.
+
+    A bucket is stored as its theoretical arrival time in milliseconds
+    (GCRA) and only moved by cache.add/incr/decr, so concurrent workers
+    sharing THROTTLE_CACHE_ALIAS never lose updates. A bucket idle long
+    enough to be full again is reset with a plain set, where a race can
+    at worst grant one extra token per concurrent request """
+    scope_suffix = None
+    timer = time.time
+
+    def __init__(self):
+        # The rate depends on the view, see allow_request
+        self.wait_seconds = None
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+    def get_rate(self):
+        # Read on every request rather than at import, unlike THROTTLE_RATES
+        return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None:
+            return True
+        self.scope = f'{scope}_{self.scope_suffix}'
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        self.wait_seconds = self.consume(key)
+        return self.wait_seconds == 0
+
+    def consume(self, key):
+        """ Take a token, returning 0 or the seconds until one is free """
+        interval = max(1, round(self.duration * 1000 / self.num_requests))
+        capacity = interval * self.num_requests
+        timeout = self.duration + 1
+        now = int(self.timer() * 1000)
+
+        self.cache.add(key, now, timeout)
+        try:
+            arrival = self.cache.incr(key, interval)
+        except ValueError:
+            # Expired between add and incr
+            self.cache.set(key, now + interval, timeout)
+            return 0
+        if arrival - interval < now:
+            self.cache.set(key, now + interval, timeout)
+        elif arrival - now > capacity:
+            try:
+                self.cache.decr(key, interval)
+            except ValueError:
+                pass
+            return (arrival - now - capacity) / 1000
+        else:
+            self.cache.touch(key, timeout)
+        return 0
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    """ One bucket per client address, see NUM_PROXIES for proxies """
+    scope_suffix = 'ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)
+        }
+
+
+class EmailThrottle(TokenBucketThrottle):
+    """ One bucket per email posted, normalized like stored emails so
+    case variations share it. Requests without an email pass """
+    scope_suffix = 'email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') \
+            if hasattr(request.data, 'get') else None
+        if not email or not isinstance(email, str):
+            return None
+        email = get_user_model().objects.normalize_email(email)
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': hashlib.sha1(email.encode()).hexdigest(),
+        }
@@ -1,5 +1,8 @@
-from rest_framework import generics, authentication, permissions
+from django.contrib.auth import get_user_model
+from rest_framework import generics, permissions
+from user.authentication import CachedTokenAuthentication
 from user.serializers import UserSerializer, AuthTokenSerializer
+from user.throttling import EmailThrottle, IPThrottle
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
@@ -8,18 +11,27 @@ from rest_framework.settings import api_settings
 
 class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
+    throttle_classes = (IPThrottle, EmailThrottle)
+    throttle_scope = 'signup'
 
 
 class CreateTokenView(ObtainAuthToken):
     """ create a new auth token for the user """
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = (IPThrottle, EmailThrottle)
+    throttle_scope = 'token'
 
 
 class Profile(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (permissions.IsAuthenticated, )
 
     def get_object(self):
-        return self.request.user
+        """ The cached request.user for reads. Writes reload the row, as
+        another worker's cached copy may be stale and the serializer
+        saves every column """
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        return get_user_model().objects.get(pk=self.request.user.pk)